@@ -0,0 +1,55 @@
+"""add course full-text and trigram search indexes
+
+Revision ID: 3f9c2a7d1b54
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1b54'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm ships with contrib, which not every Postgres has; search falls
+    # back to ILIKE on the name without it (see course_search.apply_search)
+    trigram = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).first() is not None
+    if trigram:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        """
+        ALTER TABLE courses ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED
+        """
+    )
+    op.create_index(
+        "ix_courses_search_vector", "courses", ["search_vector"],
+        postgresql_using="gin"
+    )
+    if trigram:
+        op.create_index(
+            "ix_courses_name_trgm", "courses", ["name"],
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_courses_name_trgm")
+    op.drop_index("ix_courses_search_vector", table_name="courses")
+    op.drop_column("courses", "search_vector")
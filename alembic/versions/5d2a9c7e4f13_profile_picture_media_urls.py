@@ -0,0 +1,41 @@
+"""store profile pictures as /media URLs
+
+Revision ID: 5d2a9c7e4f13
+Revises: 8b1e4d6c2a90
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a9c7e4f13'
+down_revision: Union[str, None] = '8b1e4d6c2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Paths were stored relative to MEDIA_ROOT ("uploads/..."); the mount serves that tree at /media
+    op.execute(
+        """
+        UPDATE users
+        SET profile_picture = '/media/' || substr(profile_picture, length('uploads/') + 1)
+        WHERE profile_picture LIKE 'uploads/%'
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        UPDATE users
+        SET profile_picture = 'uploads/' || substr(profile_picture, length('/media/') + 1)
+        WHERE profile_picture LIKE '/media/%'
+        """
+    )
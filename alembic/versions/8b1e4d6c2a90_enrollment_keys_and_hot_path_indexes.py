@@ -0,0 +1,46 @@
+"""fix enrollment keys and add hot-path indexes
+
+Revision ID: 8b1e4d6c2a90
+Revises: 3f9c2a7d1b54
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e4d6c2a90'
+down_revision: Union[str, None] = '3f9c2a7d1b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep one row per (user, course) - the one with the most progress - before adding the unique key
+    op.execute(
+        """
+        DELETE FROM enrollments e
+        USING enrollments keep
+        WHERE e.user_id = keep.user_id
+          AND e.course_id = keep.course_id
+          AND (coalesce(e.progress, 0), e.id::text) < (coalesce(keep.progress, 0), keep.id::text)
+        """
+    )
+    op.drop_constraint("enrollments_pkey", "enrollments", type_="primary")
+    op.create_primary_key("enrollments_pkey", "enrollments", ["id"])
+    op.create_unique_constraint("uq_enrollments_user_course", "enrollments", ["user_id", "course_id"])
+    op.create_index("ix_enrollments_course_id", "enrollments", ["course_id"])
+    op.create_index("ix_payments_user_id_status", "payments", ["user_id", "status"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_payments_user_id_status", table_name="payments")
+    op.drop_index("ix_enrollments_course_id", table_name="enrollments")
+    op.drop_constraint("uq_enrollments_user_course", "enrollments", type_="unique")
+    op.drop_constraint("enrollments_pkey", "enrollments", type_="primary")
+    op.create_primary_key("enrollments_pkey", "enrollments", ["user_id", "course_id", "id"])
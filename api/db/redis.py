@@ -0,0 +1,113 @@
+# api/db/redis.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+import redis.asyncio as redis
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Deletes the key only if it still holds the expected value, in one round trip
+COMPARE_AND_DELETE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_pool: Optional[redis.ConnectionPool] = None
+_client: Optional[redis.Redis] = None
+_blocking_client: Optional[redis.Redis] = None
+
+
+def _build_pool(max_connections: int, socket_timeout: Optional[float]) -> redis.ConnectionPool:
+    return redis.ConnectionPool(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD or None,
+        db=settings.REDIS_DB,
+        decode_responses=settings.REDIS_RESPONSE,
+        max_connections=max_connections,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_keepalive=True,
+    )
+
+
+def get_redis() -> redis.Redis:
+    """Return the process-wide Redis client backed by the shared connection pool."""
+    global _pool, _client
+    if _client is None:
+        _pool = _build_pool(settings.REDIS_MAX_CONNECTIONS, settings.REDIS_SOCKET_TIMEOUT)
+        _client = redis.Redis(connection_pool=_pool)
+    return _client
+
+
+def get_blocking_redis() -> redis.Redis:
+    """
+    Client for blocking reads (BLMOVE, XREADGROUP BLOCK) in the workers.
+
+    The shared pool's socket timeout would cut a blocking read that waits
+    as long as it, so these connections have no read timeout and rely on
+    TCP keepalive to notice a dead server.
+    """
+    global _blocking_client
+    if _blocking_client is None:
+        _blocking_client = redis.Redis(connection_pool=_build_pool(2, None))
+    return _blocking_client
+
+
+async def init_redis():
+    await get_redis().ping()
+
+
+async def close_redis():
+    global _pool, _client, _blocking_client
+    if _blocking_client is not None:
+        await _blocking_client.aclose(close_connection_pool=True)
+        _blocking_client = None
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    if _pool is not None:
+        await _pool.disconnect()
+        _pool = None
+
+
+
+async def listen(
+    channel: str,
+    on_message: Callable[[str], None],
+    on_subscribed: Optional[Callable[[], Awaitable[None]]] = None,
+    on_disconnect: Optional[Callable[[], None]] = None,
+    idle: Optional[Callable[[], None]] = None,
+):
+    """
+    Consume a pub/sub channel until cancelled, reconnecting on errors.
+
+    on_subscribed runs after every (re)subscribe so callers can resync any
+    state they may have missed while disconnected.
+    """
+    while True:
+        pubsub = get_redis().pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            if on_subscribed is not None:
+                await on_subscribed()
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None:
+                    data = message["data"]
+                    on_message(data.decode() if isinstance(data, bytes) else data)
+                if idle is not None:
+                    idle()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if on_disconnect is not None:
+                on_disconnect()
+            logger.warning(f"Redis listener on '{channel}' disconnected: {e}")
+            await asyncio.sleep(1.0)
+        finally:
+            await pubsub.aclose()
\ No newline at end of file
@@ -1,10 +1,101 @@
 # api/db/session.py
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import time
+from typing import Callable, Optional
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util.queue import AsyncAdaptedQueue
 from core.config.settings import settings
 
+
+class _TimedQueue(AsyncAdaptedQueue):
+    """Pool queue that reports how long each blocking get waited for a connection."""
+
+    on_wait: Optional[Callable[[float], None]] = None
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        if not block:
+            return super().get(block, timeout)
+        start = time.perf_counter()
+        entry = super().get(block, timeout)  # raises Empty on timeout; counted by the pool
+        if self.on_wait is not None:
+            self.on_wait(time.perf_counter() - start)
+        return entry
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long callers wait for a free connection.
+
+    Only the wait on the pool's queue is timed, not opening a new
+    connection; checkouts that time out are counted apart from the ones
+    that got a connection.
+    """
+
+    _queue_class = _TimedQueue
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_count = 0
+        self.checkout_timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._pool.on_wait = self._record_wait
+
+    def _record_wait(self, waited: float):
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def connect(self):
+        # _do_get recurses internally, so checkouts are counted once, here
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        self.checkout_count += 1
+        return connection
+
+
+def create_engine_from_settings() -> AsyncEngine:
+    return create_async_engine(
+        settings.SQLALCHEMY_DATABASE_URI,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+
+def get_pool_stats() -> dict:
+    pool = engine.sync_engine.pool
+    stats = {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+    if isinstance(pool, InstrumentedPool):
+        count = pool.checkout_count
+        stats.update({
+            "checkouts": count,
+            "checkout_timeouts": pool.checkout_timeouts,
+            "avg_wait_seconds": pool.total_wait_seconds / count if count else 0.0,
+            "max_wait_seconds": pool.max_wait_seconds,
+        })
+    return stats
+
+
 DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_engine_from_settings()
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_db():
@@ -28,7 +28,23 @@ CREATE TABLE enrollments (
     time_updated TIME WITH TIME ZONE,
     date_created DATE,
     date_updated DATE,
-    PRIMARY KEY (user_id, course_id, id),
+    PRIMARY KEY (id),
+    CONSTRAINT uq_enrollments_user_course UNIQUE (user_id, course_id),
     FOREIGN KEY(course_id) REFERENCES courses(id),
     FOREIGN KEY(user_id) REFERENCES users(id)
-);
\ No newline at end of file
+);
+
+CREATE INDEX ix_enrollments_course_id ON enrollments (course_id);
+
+-- Full-text and fuzzy search (mirrors alembic revision 3f9c2a7d1b54)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE courses ADD COLUMN search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C')
+) STORED;
+
+CREATE INDEX ix_courses_search_vector ON courses USING GIN (search_vector);
+CREATE INDEX ix_courses_name_trgm ON courses USING GIN (name gin_trgm_ops);
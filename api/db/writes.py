@@ -0,0 +1,21 @@
+# api/db/writes.py
+from typing import Any, Optional
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def update_where(db: AsyncSession, model, *criteria, values: dict, returning: tuple = ()) -> Any:
+    """
+    Apply a single UPDATE ... WHERE and commit, without loading the row first
+    or refreshing it afterwards.
+
+    Returns the RETURNING row (or None when nothing matched) if `returning`
+    columns/entities are given, otherwise the number of rows updated.
+    """
+    stmt = update(model).where(*criteria).values(**values)
+    if returning:
+        stmt = stmt.returning(*returning)
+    result = await db.execute(stmt)
+    row: Optional[Any] = result.one_or_none() if returning else None
+    await db.commit()
+    return row if returning else result.rowcount
@@ -5,12 +5,15 @@ from jose import jwt
 from core.config.settings import settings
 from datetime import datetime, timedelta
 from api.utils.token import serializer, pwd
-
+from api.utils.password_hasher import password_hasher
 
 
 def hash_passsword(password:str) -> str:
     return pwd.hash(password)
 
+async def hash_password_async(password:str) -> str:
+    return await password_hasher.hash(password)
+
 def validate_password(password:str) -> bool:
     if len(password) < 8:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Password must be at least 8 characters long")
@@ -27,9 +30,13 @@ def validate_password(password:str) -> bool:
 def verify_password(plain_password:str, hashed_password:str) -> bool:
     return pwd.verify(plain_password, hashed_password)
 
+async def verify_password_async(plain_password:str, hashed_password:str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
 def validate_email_format(email:str) -> bool:
     try:
-        valid = validate_email(email)
+        # Syntax only; deliverability is the async, cached MX check in email_utils
+        valid = validate_email(email, check_deliverability=False)
         return valid.email
     except EmailNotValidError as e:
         raise HTTPException(status_code=400, detail=f'Invalid email format: {str(e)}')
@@ -0,0 +1,77 @@
+# api/utils/email_queue.py
+import json
+import time
+import uuid
+from typing import Dict, Optional
+
+from api.db.redis import get_redis
+
+QUEUE_KEY = "email:queue"
+RETRY_KEY = "email:retry"
+DEAD_KEY = "email:dead"
+METRICS_KEY = "email:metrics"
+
+
+def processing_key(worker_id: str) -> str:
+    return f"email:processing:{worker_id}"
+
+
+async def enqueue_email(to_email: str, subject: str, content: str, text_content: Optional[str] = None) -> str:
+    """
+    Queue an outbound email for the mail worker (api/workers/email_worker.py).
+    Only a Redis LPUSH happens on the request path; no SMTP or SendGrid I/O.
+    """
+    job_id = uuid.uuid4().hex
+    job = {
+        "id": job_id,
+        "to_email": to_email,
+        "subject": subject,
+        "content": content,
+        "text_content": text_content,
+        "attempts": 0,
+        "enqueued_at": time.time(),
+    }
+    await get_redis().lpush(QUEUE_KEY, json.dumps(job))
+    return job_id
+
+
+async def enqueue_template_email(to_email: str, template: str, context: Dict) -> str:
+    """
+    Queue an email by template name. The worker renders it with the
+    precompiled templates in api.utils.email_templates, so structured
+    context (e.g. the verification token) travels as data.
+    """
+    job_id = uuid.uuid4().hex
+    job = {
+        "id": job_id,
+        "to_email": to_email,
+        "template": template,
+        "context": context,
+        "attempts": 0,
+        "enqueued_at": time.time(),
+    }
+    await get_redis().lpush(QUEUE_KEY, json.dumps(job))
+    return job_id
+
+
+async def get_queue_stats() -> Dict:
+    redis = get_redis()
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.llen(QUEUE_KEY)
+        pipe.zcard(RETRY_KEY)
+        pipe.llen(DEAD_KEY)
+        pipe.hgetall(METRICS_KEY)
+        queued, retrying, dead, metrics = await pipe.execute()
+
+    sent = int(metrics.get("sent", 0))
+    total_latency = float(metrics.get("latency_seconds_total", 0.0))
+    return {
+        "queued": queued,
+        "retrying": retrying,
+        "dead": dead,
+        "sent": sent,
+        "failed_attempts": int(metrics.get("failed_attempts", 0)),
+        "batches": int(metrics.get("batches", 0)),
+        "avg_latency_seconds": total_latency / sent if sent else 0.0,
+        "max_latency_seconds": float(metrics.get("latency_seconds_max", 0.0)),
+    }
@@ -0,0 +1,59 @@
+# api/utils/email_templates.py
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "email")
+
+# Template name -> subject line; each name has <name>.html and <name>.txt parts
+EMAIL_SUBJECTS = {
+    "verify_email": "Verify Your Email Address",
+    "resend_verification": "Your Verification Code",
+    "password_reset": "Password Reset Request",
+}
+
+
+@dataclass(frozen=True)
+class RenderedEmail:
+    subject: str
+    html: str
+    text: str
+
+
+class EmailTemplates:
+    """Loads and compiles every email template once; render() only fills in context."""
+
+    def __init__(self, directory: str = TEMPLATE_DIR):
+        self.env = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(enabled_extensions=("html",), default_for_string=False),
+            undefined=StrictUndefined,
+            auto_reload=False,
+        )
+        self._compiled: Optional[Dict[str, Dict[str, Template]]] = None
+
+    def load(self):
+        self._compiled = {
+            name: {
+                "html": self.env.get_template(f"{name}.html"),
+                "text": self.env.get_template(f"{name}.txt"),
+            }
+            for name in EMAIL_SUBJECTS
+        }
+
+    def render(self, name: str, **context) -> RenderedEmail:
+        if self._compiled is None:
+            self.load()
+        if name not in self._compiled:
+            raise ValueError(f"Unknown email template: {name}")
+        parts = self._compiled[name]
+        return RenderedEmail(
+            subject=EMAIL_SUBJECTS[name],
+            html=parts["html"].render(**context),
+            text=parts["text"].render(**context),
+        )
+
+
+email_templates = EmailTemplates()
@@ -1,102 +1,90 @@
-import smtplib
-from email.mime.text import MIMEText
 from core.config.settings import settings
-import traceback
 from pydantic import EmailStr
 import re
+import asyncio
+import dns.asyncresolver
+import dns.exception
 import dns.resolver
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from cachetools import TLRUCache
+import logging
 
+logger = logging.getLogger(__name__)
 EMAIL_REGEX = re.compile(r"^[^@]+@[^@]+\.[^@]+$")
 
 
-import smtplib
-from email.mime.text import MIMEText
-from core.config.settings import settings
-import traceback
-from pydantic import EmailStr
-import re
-import dns.resolver
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-import logging
+def is_email_format_valid(email: str) -> bool:
+    return EMAIL_REGEX.match(email) is not None
 
-logger = logging.getLogger(__name__)
-EMAIL_REGEX = re.compile(r"^[^@]+@[^@]+\.[^@]+$")
 
-def send_email_reminder(to_email: str, subject: str, content: str):
+class MXCache:
     """
-    Try sending email via Gmail SMTP (preferred).
-    If SMTP is not configured, fallback to SendGrid.
+    Async MX lookups with a per-domain cache.
+
+    A domain without MX records can still receive mail at its A/AAAA address
+    (RFC 5321 implicit MX). Positive answers are kept for the record TTL
+    (clamped to the configured bounds); definite negatives (NXDOMAIN, no
+    MX/A/AAAA) are cached for EMAIL_MX_NEGATIVE_TTL. Timeouts, SERVFAIL from
+    every nameserver (NoNameservers) and other resolver errors fail open and
+    are not cached, so flaky DNS never blocks signups. Any object with an async
+    ``resolve(domain, rdtype)`` can be passed as the resolver, so tests can
+    use a local stub.
     """
-    from_email = (
-        settings.MAIL_FROM or
-        settings.EMAILS_FROM_EMAIL or
-        "no-reply@example.com"
-    )
-
-    email_sent = False
-    
-    # --- Option 1: Gmail SMTP ---
-    if settings.EMAIL_HOST and settings.EMAIL_USERNAME and settings.EMAIL_PASSWORD:
+
+    def __init__(self, resolver=None, maxsize: int = 10000):
+        self.resolver = resolver
+        # Each value is (reachable, ttl); the entry expires ttl seconds after insert
+        self._cache = TLRUCache(maxsize=maxsize, ttu=lambda _key, value, now: now + value[1])
+        self._inflight = {}
+
+    def _get_resolver(self):
+        if self.resolver is None:
+            self.resolver = dns.asyncresolver.Resolver()
+            self.resolver.lifetime = settings.EMAIL_MX_LOOKUP_TIMEOUT
+        return self.resolver
+
+    async def has_mx(self, domain: str) -> bool:
+        domain = domain.lower().rstrip(".")
+        cached = self._cache.get(domain)
+        if cached is not None:
+            return cached[0]
+
+        # Concurrent signups for the same domain share one lookup
+        lookup = self._inflight.get(domain)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._lookup(domain))
+            self._inflight[domain] = lookup
+            lookup.add_done_callback(lambda _: self._inflight.pop(domain, None))
+        return await asyncio.shield(lookup)
+
+    async def _lookup(self, domain: str) -> bool:
+        try:
+            answer = await self._resolve_mail_host(domain)
+        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+            self._cache[domain] = (False, settings.EMAIL_MX_NEGATIVE_TTL)
+            return False
+        except Exception as e:  # timeouts and transient errors: accept now, look up again next time
+            logger.warning(f"MX lookup for {domain} failed, accepting the address: {e}")
+            return True
+
+        ttl = answer.rrset.ttl if answer.rrset is not None else settings.EMAIL_MX_MIN_TTL
+        ttl = min(max(ttl, settings.EMAIL_MX_MIN_TTL), settings.EMAIL_MX_MAX_TTL)
+        self._cache[domain] = (True, ttl)
+        return True
+
+    async def _resolve_mail_host(self, domain: str):
+        """MX records, else A, else AAAA; raises NoAnswer if the domain has none."""
+        resolver = self._get_resolver()
         try:
-            message = MIMEText(content, "html")
-            message["Subject"] = subject
-            message["From"] = from_email
-            message["To"] = to_email
-
-            # USE SMTP_SSL FOR PORT 465
-            with smtplib.SMTP_SSL(settings.EMAIL_HOST, settings.EMAIL_PORT) as server:
-                server.login(settings.EMAIL_USERNAME, settings.EMAIL_PASSWORD)
-                server.sendmail(from_email, [to_email], message.as_string())
-
-            email_sent = True
-            return 200
-        except Exception as e:
-            logger.warning(f"SMTP email failed: {e}")
-            traceback.print_exc()
-
-    # --- Option 2: SendGrid ---
-    if settings.SENDGRID_API_KEY and not email_sent:
+            return await resolver.resolve(domain, "MX")
+        except dns.resolver.NoAnswer:
+            pass
         try:
-            message = Mail(
-                from_email=from_email,
-                to_emails=to_email,
-                subject=subject,
-                html_content=content,
-            )
-            sg = SendGridAPIClient(settings.SENDGRID_API_KEY)
-            response = sg.send(message)
-
-            if 200 <= response.status_code < 300:
-                email_sent = True
-            else:
-                logger.warning(f"SendGrid failed: {response.status_code} - {response.body}")
-
-            return response.status_code
-        except Exception as e:
-            logger.warning(f"SendGrid email failed: {e}")
-            traceback.print_exc()
-
-    # --- Option 3: Development Fallback ---
-    if not email_sent:
-        # Extract verification token from HTML content for development
-        import re
-        token_match = re.search(r'<h3[^>]*>(.*?)</h3>', content)
-        if token_match:
-            token = token_match.group(1).strip()
-            logger.warning(f"Email not sent. Token for {to_email}: {token}")
-        else:
-            print("⚠️ No valid email configuration found and couldn't extract token.")
-        
-        return 200  # Return success anyway to not break the flow
-
-    return 500
+            return await resolver.resolve(domain, "A")
+        except dns.resolver.NoAnswer:
+            return await resolver.resolve(domain, "AAAA")
 
 
-def is_email_format_valid(email: str) -> bool:
-    return EMAIL_REGEX.match(email) is not None
+mx_cache = MXCache()
 
 
 async def is_email_reachable(email: str) -> bool:
@@ -106,14 +94,8 @@ async def is_email_reachable(email: str) -> bool:
     if not is_email_format_valid(email):
         return False
 
-    try:
-        domain = email.split("@")[1]
-        dns.resolver.resolve(domain, "MX")  # Query MX records
-        return True
-    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.exception.Timeout):
-        return False
-    except Exception:
-        return False
+    domain = email.split("@")[1]
+    return await mx_cache.has_mx(domain)
 
 # Add this to your email_utils.py
 def is_email_configured() -> bool:
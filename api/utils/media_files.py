@@ -0,0 +1,93 @@
+# api/utils/media_files.py
+import os
+import re
+from typing import Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+# Files written by MediaStorage are named after their SHA-256 (thumbnails add _<size>)
+_CONTENT_ADDRESSED = re.compile(r"^(?P<digest>[0-9a-f]{64})(?:_\d+)?$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+
+class ZeroCopyFileResponse(FileResponse):
+    """
+    FileResponse that hands the file descriptor to the server when it
+    advertises the ASGI zero-copy send extension, so the kernel copies the
+    file (sendfile) instead of Python reading it in chunks. Range and HEAD
+    requests, and servers without the extension, use the regular path,
+    which already implements Range support.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        headers = Headers(scope=scope)
+        if (
+            ZEROCOPY_EXTENSION not in extensions
+            or scope["method"].upper() == "HEAD"
+            or "range" in headers
+            or self.status_code != 200
+        ):
+            await super().__call__(scope, receive, send)
+            return
+
+        if self.stat_result is None:
+            self.stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            self.set_stat_headers(self.stat_result)
+
+        with open(self.path, "rb") as file:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({
+                "type": ZEROCOPY_EXTENSION,
+                "file": file,
+                "count": self.stat_result.st_size,
+                "more_body": False,
+            })
+        if self.background is not None:
+            await self.background()
+
+
+class MediaFiles(StaticFiles):
+    """
+    Serves uploaded media. Content-addressed files get a strong ETag equal to
+    their hash and a year-long immutable Cache-Control, since a given URL can
+    never change content.
+    """
+
+    def __init__(self, directory: str, **kwargs):
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(directory=directory, **kwargs)
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        headers = {"cache-control": DEFAULT_CACHE_CONTROL}
+
+        etag = self.content_etag(full_path)
+        if etag is not None:
+            headers = {"cache-control": IMMUTABLE_CACHE_CONTROL, "etag": etag}
+
+        response = ZeroCopyFileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    @staticmethod
+    def content_etag(full_path) -> Optional[str]:
+        stem, _ = os.path.splitext(os.path.basename(full_path))
+        if _CONTENT_ADDRESSED.match(stem):
+            return f'"{stem}"'
+        return None
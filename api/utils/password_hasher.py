@@ -0,0 +1,97 @@
+# api/utils/password_hasher.py
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from api.utils.token import pwd
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing/verification in a bounded worker pool so the event
+    loop keeps serving other requests while a login or signup is hashing.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hasher"
+            )
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable, *args):
+        # Back-pressure: refuse new work instead of queueing unboundedly
+        if self._pending >= self.max_pending:
+            self._record(operation, None, rejected=True)
+            logger.warning(f"Password hasher overloaded ({self._pending} pending), rejecting {operation}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly"
+            )
+
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+            self._record(operation, time.perf_counter() - start)
+
+    def _record(self, operation: str, elapsed: Optional[float], rejected: bool = False):
+        stats = self._metrics.setdefault(
+            operation, {"count": 0, "rejected": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        if rejected:
+            stats["rejected"] += 1
+            return
+        stats["count"] += 1
+        stats["total_seconds"] += elapsed
+        stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", pwd.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", pwd.verify, plain_password, hashed_password)
+
+    def stats(self) -> Dict:
+        operations = {}
+        for operation, stats in self._metrics.items():
+            count = stats["count"]
+            operations[operation] = {
+                **stats,
+                "avg_seconds": stats["total_seconds"] / count if count else 0.0
+            }
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "operations": operations
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
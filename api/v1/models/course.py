@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Float, Text, JSON, Integer
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Float, Text, JSON, Integer, Computed, Index
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 import uuid
 from api.v1.models.base_class import Base
 
@@ -22,5 +22,22 @@ class Course(Base):
     coursebenefits = Column(JSON, nullable=True)
     coursecompletion = Column(JSON, nullable=True)
 
+    # Maintained by Postgres (see alembic revision 3f9c2a7d1b54); never loaded by default
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+
     enrollments = relationship("Enrollment", back_populates="course")
-    payments = relationship("Payment", back_populates="course")
\ No newline at end of file
+    payments = relationship("Payment", back_populates="course")
+
+    __table_args__ = (
+        Index("ix_courses_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_courses_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
\ No newline at end of file
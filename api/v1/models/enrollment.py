@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Float, Integer
+from sqlalchemy import Column, ForeignKey, Float, Integer, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -7,9 +7,15 @@ from api.v1.models.base_class import BaseModel
 class Enrollment(BaseModel):
     __tablename__ = "enrollments"
 
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     progress = Column(Float, default=0.0)
 
     user = relationship("User", back_populates="enrollments")
-    course = relationship("Course", back_populates="enrollments")
\ No newline at end of file
+    course = relationship("Course", back_populates="enrollments")
+
+    # One enrollment per (user, course); the unique index also serves user_id lookups
+    __table_args__ = (
+        UniqueConstraint("user_id", "course_id", name="uq_enrollments_user_course"),
+        Index("ix_enrollments_course_id", "course_id"),
+    )
\ No newline at end of file
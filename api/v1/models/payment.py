@@ -1,5 +1,5 @@
 # api/v1/models/payment.py
-from sqlalchemy import Column, String, Float, DateTime, Boolean, ForeignKey, Integer
+from sqlalchemy import Column, String, Float, DateTime, Boolean, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -16,13 +16,17 @@ class Payment(Base):
     currency = Column(String(3), default="USD")
     paypal_order_id = Column(String(255), unique=True)
     paypal_payment_id = Column(String(255))
-    status = Column(String(50), default="pending")  # pending, completed, failed, cancelled
+    status = Column(String(50), default="pending")  # pending, approved, capturing, completed, failed, cancelled, refunded
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = relationship("User", back_populates="payments")
     course = relationship("Course", back_populates="payments")
 
+    __table_args__ = (
+        Index("ix_payments_user_id_status", "user_id", "status"),
+    )
+
     def to_dict(self):
         return {
             "id": str(self.id),
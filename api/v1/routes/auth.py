@@ -7,8 +7,9 @@ from starlette.responses import JSONResponse
 import random
 
 from core.config.settings import settings
-from api.utils.email_utils import send_email_reminder
-from api.utils.auth import validate_password, validate_email_format, verify_password, create_access_token
+from api.utils.email_queue import enqueue_template_email
+from api.utils.email_utils import is_email_reachable
+from api.utils.auth import validate_password, validate_email_format, verify_password_async, create_access_token
 from api.v1.schemas.auth import UserCreate, UserResponse, LoginRequest, Token, PasswordResetRequest, PasswordResetVerify, ResendVerificationRequest, TokenVerifyRequest, LoginResponse, UserInfo
 from api.v1.services import auth as user_service
 from api.db.session import get_db
@@ -21,40 +22,25 @@ class MessageResponse(BaseModel):
     message: str
 
 @auth.post("/signup", response_model=MessageResponse)
-async def signup(user_data: UserCreate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
+async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     try:
         validate_password(user_data.password)
         validate_email_format(user_data.email)
+        if settings.EMAIL_CHECK_MX and not await is_email_reachable(user_data.email):
+            raise HTTPException(status_code=400, detail="Email domain cannot receive mail")
 
-        existing_user = await user_service.get_user_by_email(user_data.email, db)
-        if existing_user:
-            raise HTTPException(status_code=400, detail="Email already registered")
-
-        await user_service.create_user(db, user_data)
+        await user_service.create_user(db, user_data)  # Raises ValueError if the email is taken
 
         token = str(random.randint(10000, 99999))
         await user_service.store_verification_token(user_data.email, token)
 
-        subject = "Verify Your Email Address"
-        html_content = f"""
-        <html>
-            <body>
-                <h2>Email Verification</h2>
-                <p>Use the following verification code to activate your account:</p>
-                <h3 style="color: #007BFF;">{token}</h3>
-                <p>This code is valid for 10 minutes.</p>
-            </body>
-        </html>
-        """
-
         # Only try to send email if configured, but always store the token
         from api.utils.email_utils import is_email_configured
         if is_email_configured():
-            background_tasks.add_task(
-                send_email_reminder,
+            await enqueue_template_email(
                 to_email=user_data.email,
-                subject=subject,
-                content=html_content
+                template="verify_email",
+                context={"token": token, "expires_minutes": 10}
             )
             return {"message": "Verification code sent to your email"}
         else:
@@ -73,7 +59,7 @@ async def verify_email(data: TokenVerifyRequest, db: AsyncSession = Depends(get_
         raise HTTPException(status_code=400, detail=str(e))
 
 @auth.post("/resend-verification", response_model=MessageResponse)
-async def resend_verification_email(payload: ResendVerificationRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
+async def resend_verification_email(payload: ResendVerificationRequest, db: AsyncSession = Depends(get_db)):
     email = payload.email
     user = await user_service.get_user_by_email(email, db)
     if not user:
@@ -85,24 +71,12 @@ async def resend_verification_email(payload: ResendVerificationRequest, backgrou
     token = str(random.randint(10000, 99999))
     await user_service.store_verification_token(user.email, token)
 
-    html_content = f"""
-    <html>
-        <body>
-            <h2>Verify Your Email</h2>
-            <p>Use the following verification code to verify your email address:</p>
-            <h3 style="font-size: 24px; color: #007BFF;">{token}</h3>
-            <p>If you didn't request this, you can safely ignore it.</p>
-        </body>
-    </html>
-    """
-
     from api.utils.email_utils import is_email_configured
     if is_email_configured():
-        background_tasks.add_task(
-            send_email_reminder,
+        await enqueue_template_email(
             to_email=user.email,
-            subject="Your Verification Code",
-            content=html_content
+            template="resend_verification",
+            context={"token": token}
         )
         return {"message": "Verification email resent"}
     else:
@@ -110,11 +84,9 @@ async def resend_verification_email(payload: ResendVerificationRequest, backgrou
     
 @auth.post("/login", response_model=LoginResponse)
 async def login(response: Response, user_data: LoginRequest, db: AsyncSession = Depends(get_db)):
-    stmt = select(User).where(User.email == user_data.email)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await user_service.get_login_user(user_data.email, db)
 
-    if not user or not verify_password(user_data.password, user.password_hash):
+    if not user or not await verify_password_async(user_data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     if not user.is_verified:
@@ -163,7 +135,7 @@ async def logout(response: Response, request: Request):
     return {"message": "Logged out successfully"}
 
 @auth.post("/forgot-password", response_model=MessageResponse)
-async def forgot_password(data: PasswordResetRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
+async def forgot_password(data: PasswordResetRequest, db: AsyncSession = Depends(get_db)):
     user = await user_service.get_user_by_email(data.email, db)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -171,31 +143,17 @@ async def forgot_password(data: PasswordResetRequest, background_tasks: Backgrou
     token = str(random.randint(10000, 99999))
     await user_service.store_reset_token(data.email, token)  # Use store_reset_token
 
-    subject = "Password Reset Request"
-    html_content = f"""
-    <html>
-        <body>
-            <h2>Password Reset</h2>
-            <p>You requested to reset your password. Use the token below to proceed:</p>
-            <h3 style="color: #007BFF;">{token}</h3>
-            <p>This token is valid for 10 minutes.</p>
-            <p>If you did not request this, please ignore this email.</p>
-        </body>
-    </html>
-    """
-
-    background_tasks.add_task(
-        send_email_reminder,
+    await enqueue_template_email(
         to_email=data.email,
-        subject=subject,
-        content=html_content
+        template="password_reset",
+        context={"token": token, "expires_minutes": 10}
     )
 
     return {"message": "Password reset token sent to your email"}
 
 @auth.post("/reset-password", response_model=MessageResponse)
 async def reset_password(data: PasswordResetVerify, db: AsyncSession = Depends(get_db)):
-    email = await user_service.verify_token(data.token)
+    email = await user_service.consume_reset_token(data.token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
 
@@ -204,7 +162,6 @@ async def reset_password(data: PasswordResetVerify, db: AsyncSession = Depends(g
         raise HTTPException(status_code=404, detail="User not found")
 
     await user_service.update_user_password(user, data.new_password, db)
-    await user_service.delete_token(data.token)
 
     return {"message": "Password reset successfully"}
 
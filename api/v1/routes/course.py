@@ -1,40 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query, Header
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from api.v1.services.course_service import CourseService
+from api.v1.services.course_service import CourseService, parse_fields, parse_ids
 from api.v1.models.course import Course
+from api.v1.schemas.course import Course as CourseSchema, serialize_courses
 from api.v1.models.enrollment import Enrollment
 from api.v1.models.user import User
 from api.db.session import get_db
 from api.v1.services.auth import get_current_user
+from api.v1.services.catalog_cache import catalog_cache
+from api.v1.services.idempotency import get_stored_response, store_response
+from core.config.settings import settings
 
 course_router = APIRouter(prefix="/courses", tags=["Courses"])
 
-@course_router.get("/")
-async def get_courses(category: str = None, search: str = None, db: AsyncSession = Depends(get_db)):
-    courses = await CourseService.get_all_courses(db, category, search)
-    return courses
+# The handler returns cached JSON bytes itself, so the schema is documentation only
+@course_router.get("/", response_class=Response, responses={200: {"model": list[CourseSchema]}})
+async def get_courses(
+    request: Request,
+    category: str = None,
+    search: str = None,
+    limit: int = Query(
+        None, ge=1, le=settings.COURSE_PAGE_SIZE_MAX,
+        description=f"Page size, {settings.COURSE_PAGE_SIZE_DEFAULT} by default; not allowed with ids"
+    ),
+    cursor: str = None,
+    fields: str = None,
+    ids: str = Query(None, description="Comma-separated course ids for bulk lookup, all returned in one page"),
+    db: AsyncSession = Depends(get_db)
+):
+    field_names = parse_fields(fields)
+    course_ids = parse_ids(ids, settings.COURSE_PAGE_SIZE_MAX)
+    if course_ids:
+        if limit is not None:
+            raise HTTPException(status_code=400, detail="limit cannot be combined with ids")
+        limit = len(course_ids)
+    elif limit is None:
+        limit = settings.COURSE_PAGE_SIZE_DEFAULT
 
-@course_router.get("/{course_id}")
+    async def build():
+        courses, next_cursor = await CourseService.get_courses_page(
+            db, category, search, limit, cursor, field_names, course_ids
+        )
+        return serialize_courses(courses), next_cursor
+
+    key = (
+        category, search, limit, cursor,
+        tuple(field_names) if field_names else None,
+        tuple(course_ids) if course_ids else None
+    )
+    entry = await catalog_cache.get_or_build(key, build)
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": entry.last_modified,
+        "Cache-Control": "public, max-age=0, must-revalidate",
+    }
+    # The body stays a plain list for existing clients; paging metadata travels in headers
+    if entry.next_cursor:
+        headers["X-Next-Cursor"] = entry.next_cursor
+        next_url = request.url.include_query_params(cursor=entry.next_cursor)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    if catalog_cache.etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+@course_router.get("/{course_id}", response_model=CourseSchema, response_class=ORJSONResponse)
 async def get_course(course_id: int, db: AsyncSession = Depends(get_db)):
     course = await CourseService.get_course_by_id(db, course_id)
     return course
 
 @course_router.post("/enroll/{course_id}", response_model=dict)
-async def enroll_course(course_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    # Check if course exists using CourseService
-    course = await CourseService.get_course_by_id(db, course_id)  # Raises 404 if not found
+async def enroll_course(
+    course_id: int,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    scope = f"enroll:{current_user.id}:{course_id}"
+    if idempotency_key:
+        stored = await get_stored_response(scope, idempotency_key)
+        if stored is not None:
+            return stored
 
-    # Check if already enrolled
-    result = await db.execute(
-        select(Enrollment).where(Enrollment.user_id == current_user.id, Enrollment.course_id == course_id)
-    )
-    if result.scalar_one_or_none():
+    # Single INSERT ... ON CONFLICT DO NOTHING; raises 404 if the course does not exist
+    course_name, created = await CourseService.enroll_user(db, current_user.id, course_id)
+    if not created and not idempotency_key:
         raise HTTPException(status_code=400, detail="Already enrolled in this course")
 
-    # Create enrollment
-    enrollment = Enrollment(user_id=current_user.id, course_id=course_id)
-    db.add(enrollment)
-    await db.commit()
-    await db.refresh(enrollment)
-    return {"message": f"Enrolled in course {course.name} successfully"}
\ No newline at end of file
+    # With an Idempotency-Key, a conflicting insert is a retry of an earlier success
+    response = {"message": f"Enrolled in course {course_name} successfully"}
+    if idempotency_key:
+        await store_response(scope, idempotency_key, response)
+    return response
\ No newline at end of file
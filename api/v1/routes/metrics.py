@@ -0,0 +1,42 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from api.db.session import get_pool_stats
+from api.utils.password_hasher import password_hasher
+from api.utils.email_queue import get_queue_stats
+from api.v1.services.paypal_webhooks import get_webhook_stats
+from api.v1.services.paypal_resilience import get_paypal_stats
+from core.config.settings import settings
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)):
+    """Metrics expose pool and queue internals, so they are for operators only."""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    token = (authorization or "").removeprefix("Bearer ")
+    if not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"], dependencies=[Depends(require_metrics_token)])
+
+@metrics_router.get("/db")
+async def get_db_metrics():
+    return get_pool_stats()
+
+@metrics_router.get("/password-hasher")
+async def get_password_hasher_metrics():
+    return password_hasher.stats()
+
+@metrics_router.get("/email")
+async def get_email_queue_metrics():
+    return await get_queue_stats()
+
+@metrics_router.get("/paypal-webhooks")
+async def get_paypal_webhook_metrics():
+    return await get_webhook_stats()
+
+@metrics_router.get("/paypal")
+async def get_paypal_metrics():
+    return get_paypal_stats()
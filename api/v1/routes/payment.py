@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Dict
@@ -8,7 +8,10 @@ from api.v1.services.auth import get_current_user
 from api.v1.models.user import User
 from api.v1.models.payment import Payment
 from api.v1.models.course import Course
-from api.v1.services.payment import PayPalService
+from api.v1.services.payment import get_paypal_service
+from api.v1.services.paypal_resilience import PayPalRequestError, PayPalUnavailableError
+from api.v1.services.checkout import CheckoutService, capture_id_from, capture_request_id
+from api.v1.services.paypal_webhooks import ingest_webhook
 from pydantic import BaseModel, Field
 import logging
 
@@ -32,8 +35,12 @@ async def create_paypal_order(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Create a PayPal order for course purchase"""
-    paypal_service = PayPalService()
+    """
+    Create a PayPal order for course purchase. The payment row is committed
+    before PayPal is called and updated afterwards, so the session's
+    connection goes back to the pool while the order is being created.
+    """
+    paypal_service = get_paypal_service()
     
     try:
         # Validate course_id as an integer
@@ -45,40 +52,22 @@ async def create_paypal_order(
                 detail="Invalid course ID format: must be an integer"
             )
         
-        # Fetch course to get its UUID
-        result = await db.execute(
-            select(Course).where(Course.id == course_id_int)
-        )
-        course = result.scalar_one_or_none()
-        if not course:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Course not found"
-            )
-        
-        course_id_uuid = course.id  # Course.id is a UUID
-        
-        # Create order in PayPal
-        order_data = await paypal_service.create_order(
-            amount=request.amount,
-            currency=request.currency,
-            course_id=str(course_id_int),  # Send integer as string to PayPal
-            user_id=str(current_user.id)
-        )
-        
-        # Save payment record in database
-        payment = Payment(
-            user_id=current_user.id,
-            course_id=request.course_id,
-            amount=request.amount,
-            currency=request.currency,
-            paypal_order_id=order_data["id"],
-            status="pending"
+        payment = await CheckoutService.begin_order(
+            db, current_user.id, course_id_int, request.amount, request.currency
         )
         
-        db.add(payment)
-        await db.commit()
-        await db.refresh(payment)
+        # Create order in PayPal; the payment id doubles as PayPal-Request-Id
+        try:
+            order_data = await paypal_service.create_order(
+                amount=request.amount,
+                currency=request.currency,
+                course_id=str(course_id_int),  # Send integer as string to PayPal
+                user_id=str(current_user.id),
+                request_id=str(payment.id)
+            )
+        except Exception:
+            await CheckoutService.fail_order(db, payment.id)
+            raise
         
         # Find approval URL
         approval_url = None
@@ -88,11 +77,14 @@ async def create_paypal_order(
                 break
         
         if not approval_url:
+            await CheckoutService.fail_order(db, payment.id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No approval URL found in PayPal response"
             )
         
+        await CheckoutService.attach_order(db, payment.id, order_data["id"])
+        
         return CreateOrderResponse(
             order_id=order_data["id"],
             approval_url=approval_url,
@@ -101,6 +93,12 @@ async def create_paypal_order(
         
     except HTTPException:
         raise
+    except PayPalUnavailableError as e:
+        logger.error(f"Failed to create order: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payment provider is unavailable, please try again shortly"
+        )
     except Exception as e:
         logger.error(f"Failed to create order: {str(e)}")
         raise HTTPException(
@@ -114,29 +112,31 @@ async def capture_paypal_order(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Capture a PayPal order"""
-    paypal_service = PayPalService()
+    """
+    Capture a PayPal order. The payment is claimed as `capturing` and
+    committed before PayPal is called, then settled in a second transaction.
+    If PayPal's answer is lost (timeout, 5xx), the payment stays `capturing`
+    and a retry re-issues the capture under the same PayPal-Request-Id.
+    """
+    paypal_service = get_paypal_service()
     
     try:
-        # Fetch payment record
-        result = await db.execute(
-            select(Payment).where(Payment.paypal_order_id == order_id)
-        )
-        payment = result.scalar_one_or_none()
-        
-        if not payment:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Payment not found"
-            )
+        payment_id, previous_status = await CheckoutService.begin_capture(db, order_id)
         
         # Capture order in PayPal
-        capture_data = await paypal_service.capture_order(order_id)
+        try:
+            capture_data = await paypal_service.capture_order(order_id, request_id=capture_request_id(payment_id))
+        except PayPalRequestError as e:
+            if e.issue != "ORDER_ALREADY_CAPTURED":
+                # PayPal refused; nothing was captured, so the buyer may try again
+                await CheckoutService.abort_capture(db, payment_id, previous_status)
+                raise
+            # Captured by an earlier request; settle from the order itself
+            capture_data = await paypal_service.get_order(order_id)
         
-        # Update payment status
-        payment.status = capture_data["status"].lower()
-        await db.commit()
-        await db.refresh(payment)
+        await CheckoutService.finish_capture(
+            db, payment_id, capture_data["status"].lower(), capture_id_from(capture_data)
+        )
         
         return {
             "order_id": order_id,
@@ -146,9 +146,25 @@ async def capture_paypal_order(
         
     except HTTPException:
         raise
+    except PayPalUnavailableError as e:
+        logger.error(f"Failed to capture order: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payment provider is unavailable, please try again shortly"
+        )
     except Exception as e:
         logger.error(f"Failed to capture order: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to capture order: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/webhook")
+async def paypal_webhook(request: Request):
+    """
+    Receive PayPal webhook deliveries. The signature is verified locally and
+    the event is queued for api/workers/paypal_webhook_worker.py, so PayPal
+    gets its 200 without waiting on the database.
+    """
+    event_id = await ingest_webhook(request.headers, await request.body())
+    return {"event_id": event_id, "status": "queued"}
@@ -1,14 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
+from datetime import date
 from api.v1.schemas.auth import UserResponse, UserUpdate, GenderEnum
 from api.v1.schemas.course import UpdateProgress
 from api.v1.models.user import User
 from api.v1.models.enrollment import Enrollment
 from api.v1.models.course import Course
+from api.v1.models.payment import Payment
 from api.db.session import get_db
+from api.db.writes import update_where
 from api.v1.services.auth import get_current_user
+from api.v1.services.user_cache import user_cache
+from api.v1.services.progress_buffer import progress_buffer
+from api.v1.services.media_storage import media_storage
+from core.config.settings import settings
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -24,6 +31,28 @@ class EnrolledCourseResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class DashboardEnrollment(BaseModel):
+    id: int
+    name: str
+    summary: str
+    category: str
+    image: str | None
+    duration: str | None
+    price: float
+    progress: float
+    enrolled_on: date | None
+    payment_status: str | None
+
+class DashboardStats(BaseModel):
+    total_courses: int
+    completed_courses: int
+    in_progress_courses: int
+    average_progress: float
+
+class DashboardResponse(BaseModel):
+    enrollments: List[DashboardEnrollment]
+    stats: DashboardStats
+
 @router.get("/profile", response_model=UserResponse)
 async def get_user_profile(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     # The UserResponse model will automatically handle UUID serialization
@@ -39,25 +68,67 @@ async def get_user_profile(current_user: User = Depends(get_current_user), db: A
         profile_picture=current_user.profile_picture
     )
 
+def _current_progress(stored: Optional[float], buffered: Optional[float]) -> Optional[float]:
+    # A buffered report lower than the stored value is never written over it
+    if buffered is None:
+        return stored
+    return max(buffered, stored or 0.0)
+
 @router.get("/enrollments", response_model=List[EnrolledCourseResponse])
 async def get_enrolled_courses(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    # Project only the listed columns instead of loading full Course rows
     result = await db.execute(
-        select(Course, Enrollment.progress)
+        select(Course.id, Course.name, Course.summary, Course.category, Course.image, Enrollment.progress)
         .join(Enrollment, Enrollment.course_id == Course.id)
         .where(Enrollment.user_id == current_user.id)
     )
-    courses = result.all()
+    rows = result.mappings().all()
+    # Read-your-writes: include progress that has not been flushed yet
+    pending = await progress_buffer.pending_for(current_user.id, [row["id"] for row in rows])
     return [
-        {
-            "id": course.id,
-            "name": course.name,
-            "summary": course.summary,
-            "category": course.category,
-            "image": course.image,
-            "progress": progress
-        }
-        for course, progress in courses
+        {**row, "progress": _current_progress(row["progress"], pending.get(row["id"]))}
+        for row in rows
+    ]
+
+@router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Enrollments, course summaries, completion stats and payment status in one query."""
+    latest_payment_status = (
+        select(Payment.status)
+        .where(Payment.user_id == Enrollment.user_id, Payment.course_id == Enrollment.course_id)
+        .order_by(Payment.created_at.desc())
+        .limit(1)
+        .correlate(Enrollment)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            Course.id, Course.name, Course.summary, Course.category, Course.image,
+            Course.duration, Course.price, Enrollment.progress, Enrollment.date_created.label("enrolled_on"),
+            latest_payment_status.label("payment_status")
+        )
+        .join(Enrollment, Enrollment.course_id == Course.id)
+        .where(Enrollment.user_id == current_user.id)
+        .order_by(Enrollment.date_created.desc(), Course.id)
+    )
+    rows = result.mappings().all()
+    pending = await progress_buffer.pending_for(current_user.id, [row["id"] for row in rows])
+
+    enrollments = [
+        {**row, "progress": _current_progress(row["progress"], pending.get(row["id"])) or 0.0}
+        for row in rows
     ]
+    total = len(enrollments)
+    completed = sum(1 for enrollment in enrollments if enrollment["progress"] >= 100.0)
+    return {
+        "enrollments": enrollments,
+        "stats": {
+            "total_courses": total,
+            "completed_courses": completed,
+            "in_progress_courses": total - completed,
+            "average_progress": sum(e["progress"] for e in enrollments) / total if total else 0.0,
+        }
+    }
 
 @router.post("/courses/{course_id}/progress")
 async def update_progress(
@@ -66,16 +137,10 @@ async def update_progress(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(
-        select(Enrollment).where(Enrollment.user_id == current_user.id, Enrollment.course_id == course_id)
-    )
-    enrollment = result.scalar_one_or_none()
-    if not enrollment:
+    if not await progress_buffer.is_enrolled(db, current_user.id, course_id):
         raise HTTPException(status_code=404, detail="Enrollment not found")
-    enrollment.progress = min(max(progress_data.progress, 0.0), 100.0)
-    db.add(enrollment)
-    await db.commit()
-    await db.refresh(enrollment)
+    # Buffered and coalesced; progress_buffer flushes to Postgres in batches
+    await progress_buffer.record(current_user.id, course_id, min(max(progress_data.progress, 0.0), 100.0))
     return {"message": "Progress updated"}
 
 @router.post("/profile/picture")
@@ -84,14 +149,19 @@ async def upload_profile_picture(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    file_path = f"uploads/{current_user.id}_{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
-    current_user.profile_picture = file_path
-    db.add(current_user)
-    await db.commit()
-    await db.refresh(current_user)
-    return {"message": "Profile picture updated"}
+    relative_path, thumbnails = await media_storage.save_image(
+        file, kind="profile", max_bytes=settings.MEDIA_MAX_PROFILE_PICTURE_BYTES
+    )
+    picture_url = media_storage.url_for(relative_path)
+    await update_where(db, User, User.id == current_user.id, values={"profile_picture": picture_url})
+    await user_cache.invalidate_user(current_user.id)
+    # Thumbnails sit next to the original as <sha256>_<size>.jpg, so clients
+    # can also derive them from profile_picture for any MEDIA_THUMBNAIL_SIZES
+    return {
+        "message": "Profile picture updated",
+        "profile_picture": picture_url,
+        "thumbnails": {str(size): media_storage.url_for(path) for size, path in thumbnails.items()},
+    }
 
 @router.put("/profile")
 async def update_profile(
@@ -100,10 +170,8 @@ async def update_profile(
     db: AsyncSession = Depends(get_db)
 ):
     # Remove the file parameter from here - it should be in a separate endpoint
-    for field, value in user_data.dict(exclude_unset=True).items():
-        setattr(current_user, field, value)
-    
-    db.add(current_user)
-    await db.commit()
-    await db.refresh(current_user)
+    values = user_data.dict(exclude_unset=True)
+    if values:
+        await update_where(db, User, User.id == current_user.id, values=values)
+    await user_cache.invalidate_user(current_user.id)
     return {"message": "Profile updated successfully"}
\ No newline at end of file
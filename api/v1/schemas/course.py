@@ -1,23 +1,35 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import Any, Optional, List
 
 class Course(BaseModel):
+    """
+    Public course representation. Python names are snake_case; aliases match
+    the database columns, which are also the JSON keys clients already use.
+    Everything except id is optional so `fields=` projections validate too.
+    """
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
     id: int
-    name: str
-    category: str
+    name: Optional[str] = None
+    category: Optional[str] = None
     duration: Optional[str] = None
     summary: Optional[str] = None
     image: Optional[str] = None
-    price: float
+    price: Optional[float] = None
     description: Optional[str] = None
-    courseObjectives: Optional[List] = None
-    curriculum: Optional[List] = None
-    targetAudience: Optional[List] = None
-    courseBenefits: Optional[List] = None
-    courseCompletion: Optional[List] = None
+    course_objectives: Optional[List[Any]] = Field(None, alias="courseobjectives")
+    curriculum: Optional[List[Any]] = None
+    target_audience: Optional[List[Any]] = Field(None, alias="targetaudience")
+    course_benefits: Optional[List[Any]] = Field(None, alias="coursebenefits")
+    course_completion: Optional[List[Any]] = Field(None, alias="coursecompletion")
+
+# Built once at import; reused for every catalog serialization
+CourseList = TypeAdapter(List[Course])
 
-    class Config:
-        from_attributes = True
+def serialize_courses(courses) -> bytes:
+    """Validate ORM rows (or projected dicts) and dump them straight to JSON bytes."""
+    validated = CourseList.validate_python(courses, from_attributes=True)
+    return CourseList.dump_json(validated, by_alias=True, exclude_unset=True)
 
 class EnrollResponse(BaseModel):
     message: str
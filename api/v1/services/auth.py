@@ -1,28 +1,23 @@
 # api/v1/services/user_service.py
 from fastapi import Depends, Request, HTTPException, status
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 from typing import Optional
 from datetime import datetime
-import redis.asyncio as redis
 import logging
 import uuid
 
 from api.db.session import get_db
+from api.db.redis import COMPARE_AND_DELETE, get_redis
+from api.db.writes import update_where
 from api.v1.models.user import User
 from core.config.settings import settings
 from api.v1.schemas.auth import UserCreate
-from api.utils.auth import verify_password, hash_passsword  # Use your auth.py
-
-r = redis.Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    password=settings.REDIS_PASSWORD,
-    db=settings.REDIS_DB,
-    decode_responses=settings.REDIS_RESPONSE,
-    ssl=False
-)
+from api.utils.auth import verify_password, hash_password_async  # Use your auth.py
+from api.v1.services.user_cache import user_cache
+from api.v1.services.token_revocation import revocation_cache
 
 logger = logging.getLogger(__name__)
 
@@ -46,8 +41,14 @@ async def get_current_user(request: Request, db: AsyncSession = Depends(get_db))
         raise HTTPException(status_code=401, detail="Missing authentication token")
 
     if await is_token_blacklisted(token):
+        user_cache.invalidate_token(token)
         raise HTTPException(status_code=401, detail="Token has been revoked")
 
+    cached = user_cache.get(token)
+    if cached is not None:
+        _, user = cached
+        return user
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id_str: str = payload.get("sub")
@@ -70,52 +71,73 @@ async def get_current_user(request: Request, db: AsyncSession = Depends(get_db))
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
+    user_cache.set(token, payload, user)
     return user
 
-async def create_user(db: AsyncSession, user_data: UserCreate):
-    existing_user = await get_user_by_email(user_data.email, db)
-    if existing_user:
-        raise ValueError("Email already registered")
-
+async def create_user(db: AsyncSession, user_data: UserCreate) -> uuid.UUID:
+    """
+    Insert the user in one statement. ON CONFLICT replaces the separate
+    existence check, so a duplicate email costs no extra round trip and two
+    concurrent signups cannot both pass the check.
+    """
     # Hash password using your api/utils/auth.py
-    hashed_password = hash_passsword(user_data.password)
-
-    db_user = User(
-        email=user_data.email,
-        password_hash=hashed_password,
-        first_name=user_data.first_name,
-        last_name=user_data.last_name,
-        phone_number=user_data.phone_number,
-        date_of_birth=user_data.date_of_birth,
-        gender=user_data.gender,
-        is_verified=False
+    hashed_password = await hash_password_async(user_data.password)
+
+    stmt = (
+        pg_insert(User)
+        .values(
+            email=user_data.email,
+            password_hash=hashed_password,
+            first_name=user_data.first_name,
+            last_name=user_data.last_name,
+            phone_number=user_data.phone_number,
+            date_of_birth=user_data.date_of_birth,
+            gender=user_data.gender,
+            is_verified=False
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id)
     )
-    db.add(db_user)
+    result = await db.execute(stmt)
+    user_id = result.scalar_one_or_none()
+    if user_id is None:
+        await db.rollback()
+        raise ValueError("Email already registered")
     await db.commit()
-    await db.refresh(db_user)
-    return db_user
+    return user_id
+
+# Columns login needs: credentials plus everything returned in UserInfo
+LOGIN_COLUMNS = (
+    User.id,
+    User.password_hash,
+    User.is_verified,
+    User.first_name,
+    User.last_name,
+    User.email,
+    User.date_of_birth,
+    User.gender,
+    User.phone_number,
+    User.profile_picture,
+)
+
+async def get_login_user(email: str, db: AsyncSession):
+    stmt = select(*LOGIN_COLUMNS).where(User.email == email)
+    result = await db.execute(stmt)
+    return result.one_or_none()
 
 async def store_verification_token(email: str, token: str):
-    async with r as redis:
-        await redis.setex(f"verification_token:{email}", 600, token)
+    await get_redis().setex(f"verification_token:{email}", 600, token)
 
 async def verify_user_email(db: AsyncSession, email: str, token: str) -> User:
-    async with r as redis:
-        stored_token = await redis.get(f"verification_token:{email}")
-        if not stored_token or stored_token != token:
-            raise ValueError("Invalid or expired verification token")
-
-        user = await get_user_by_email(email, db)
-        if not user:
-            raise ValueError("User not found")
-
-        user.is_verified = True
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
+    # Check and consume the token atomically instead of GET followed by DELETE
+    deleted = await get_redis().eval(COMPARE_AND_DELETE, 1, f"verification_token:{email}", token)
+    if not deleted:
+        raise ValueError("Invalid or expired verification token")
 
-        await redis.delete(f"verification_token:{email}")
-        return user
+    row = await update_where(db, User, User.email == email, values={"is_verified": True}, returning=(User,))
+    if row is None:
+        raise ValueError("User not found")
+    return row[0]
 
 # --- Token Blacklisting & Password Reset Token ---
 async def blacklist_token(token: str):
@@ -123,37 +145,40 @@ async def blacklist_token(token: str):
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         exp = payload.get("exp")
         if exp:
-            ttl = int(exp - datetime.utcnow().timestamp())
-            if ttl > 0:
-                async with r as redis:
-                    await redis.setex(token, ttl, "blacklisted")
+            await revocation_cache.revoke(token, exp)
+        user_cache.invalidate_token(token)
     except Exception as e:
         logger.error(f"Error blacklisting token: {e}")
 
 async def is_token_blacklisted(token: str) -> bool:
-    async with r as redis:
-        result = await redis.get(token)
-        return result == "blacklisted"
+    revoked = revocation_cache.is_revoked(token)
+    if revoked is not None:
+        return revoked
+
+    result = await get_redis().get(token)
+    return result == "blacklisted"
 
 async def store_reset_token(email: str, token: str, expiry: int = 600):
-    async with r as redis:
-        key = f"reset_token:{token}"
-        await redis.setex(key, expiry, email)
+    key = f"reset_token:{token}"
+    await get_redis().setex(key, expiry, email)
 
 async def verify_token(token: str) -> Optional[str]:
-    async with r as redis:
-        key = f"reset_token:{token}"
-        email = await redis.get(key)
-        return email
+    key = f"reset_token:{token}"
+    return await get_redis().get(key)
+
+async def consume_reset_token(token: str) -> Optional[str]:
+    """Read and delete a reset token in a single pipelined round trip."""
+    key = f"reset_token:{token}"
+    async with get_redis().pipeline(transaction=True) as pipe:
+        email, _ = await pipe.get(key).delete(key).execute()
+    return email
 
 async def delete_token(token: str):
-    async with r as redis:
-        key = f"reset_token:{token}"
-        await redis.delete(key)
+    key = f"reset_token:{token}"
+    await get_redis().delete(key)
 
 # --- Update Password ---
 async def update_user_password(user: User, new_password: str, db: AsyncSession):
-    user.password_hash = hash_passsword(new_password)
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
\ No newline at end of file
+    password_hash = await hash_password_async(new_password)
+    await update_where(db, User, User.id == user.id, values={"password_hash": password_hash})
+    await user_cache.invalidate_user(user.id)
\ No newline at end of file
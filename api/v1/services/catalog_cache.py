@@ -0,0 +1,126 @@
+# api/v1/services/catalog_cache.py
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from typing import Awaitable, Callable, Optional, Tuple
+from cachetools import TTLCache
+
+from api.db.redis import close_redis, get_redis, listen
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    body: bytes
+    etag: str
+    last_modified: str
+    next_cursor: Optional[str] = None
+
+
+@dataclass
+class _KeyLock:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+class CatalogCache:
+    """
+    Per-worker cache of serialized course listings keyed by query parameters.
+
+    Entries hold the final JSON bytes so a hit skips both the database and
+    serialization. Course writes call invalidate(), which is broadcast over
+    Redis pub/sub; for changes made outside the API (e.g. SQL seeds) run
+    `python -m api.v1.services.catalog_cache`, and the TTL bounds staleness
+    if that is forgotten.
+    """
+
+    def __init__(self, channel: str, maxsize: int, ttl: int):
+        self.channel = channel
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._locks: dict = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def get_or_build(
+        self, key: Tuple, build: Callable[[], Awaitable[Tuple[bytes, Optional[str]]]]
+    ) -> CatalogEntry:
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        # Collapse concurrent misses for the same key into one query. The lock
+        # stays registered until its last user is done, so a caller arriving
+        # while others still wait joins them instead of building in parallel.
+        key_lock = self._locks.setdefault(key, _KeyLock())
+        key_lock.users += 1
+        try:
+            async with key_lock.lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    body, next_cursor = await build()
+                    entry = CatalogEntry(
+                        body=body,
+                        etag=f'"{hashlib.sha1(body).hexdigest()}"',
+                        last_modified=formatdate(time.time(), usegmt=True),
+                        next_cursor=next_cursor,
+                    )
+                    self._entries[key] = entry
+        finally:
+            # Also on failure (e.g. a 400 for a bad cursor), or locks pile up per key
+            key_lock.users -= 1
+            if not key_lock.users:
+                del self._locks[key]
+        return entry
+
+    @staticmethod
+    def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        if not if_none_match:
+            return False
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+    def clear(self):
+        self._entries.clear()
+
+    async def invalidate(self):
+        """Drop cached listings on every worker."""
+        self.clear()
+        await get_redis().publish(self.channel, "invalidate")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(
+                listen(self.channel, on_message=lambda _: self.clear(), on_disconnect=self.clear)
+            )
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+catalog_cache = CatalogCache(
+    channel=settings.CATALOG_CACHE_CHANNEL,
+    maxsize=settings.CATALOG_CACHE_SIZE,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS
+)
+
+
+async def main():
+    """Tell every API worker to drop its cached listings."""
+    try:
+        await catalog_cache.invalidate()
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
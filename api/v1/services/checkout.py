@@ -0,0 +1,123 @@
+# api/v1/services/checkout.py
+import uuid
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.v1.models.course import Course
+from api.v1.models.payment import Payment
+
+# A payment moves pending -> approved (webhook) -> capturing -> completed.
+# Each step is its own short transaction, committed before PayPal is called,
+# so no pooled connection is held while waiting on the network. The payment
+# row is the outbox: `capturing` records a capture whose outcome is not yet
+# known. It stays there until PayPal gives a definite answer, and the
+# capture is re-issued with the same PayPal-Request-Id (see capture_request_id)
+# on the next capture call, or settled by the webhook consumer, whichever
+# comes first.
+CAPTURABLE_STATUSES = ("pending", "approved")
+
+
+def capture_request_id(payment_id: uuid.UUID) -> str:
+    """Stable per payment, so PayPal replays a capture instead of repeating it."""
+    return f"capture-{payment_id}"
+
+
+class CheckoutService:
+    @staticmethod
+    async def begin_order(db: AsyncSession, user_id: uuid.UUID, course_id: int, amount: float, currency: str) -> Payment:
+        """Record the payment before PayPal is asked to create its order."""
+        course_exists = await db.scalar(select(Course.id).where(Course.id == course_id))
+        if course_exists is None:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+        payment = Payment(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            course_id=course_id,
+            amount=amount,
+            currency=currency,
+            status="pending",
+        )
+        db.add(payment)
+        await db.commit()
+        return payment
+
+    @staticmethod
+    async def attach_order(db: AsyncSession, payment_id: uuid.UUID, order_id: str):
+        await db.execute(
+            update(Payment).where(Payment.id == payment_id).values(paypal_order_id=order_id)
+        )
+        await db.commit()
+
+    @staticmethod
+    async def fail_order(db: AsyncSession, payment_id: uuid.UUID):
+        await db.execute(
+            update(Payment)
+            .where(Payment.id == payment_id, Payment.status == "pending")
+            .values(status="failed")
+        )
+        await db.commit()
+
+    @staticmethod
+    async def begin_capture(db: AsyncSession, order_id: str) -> Tuple[uuid.UUID, str]:
+        """
+        Claim the payment for capture. The conditional UPDATE lets exactly one
+        concurrent request through; returns (payment id, status to restore if
+        PayPal refuses the capture). A payment already `capturing` had an
+        earlier capture with an unknown outcome; it is handed back so the
+        caller re-issues that capture under the same request id.
+        """
+        row = (await db.execute(
+            select(Payment.id, Payment.status).where(Payment.paypal_order_id == order_id)
+        )).one_or_none()
+        if row is None:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found")
+        payment_id, previous_status = row
+        if previous_status == "capturing":
+            await db.rollback()
+            return payment_id, "pending"
+        claimed = None
+        if previous_status in CAPTURABLE_STATUSES:
+            claimed = await db.scalar(
+                update(Payment)
+                .where(Payment.id == payment_id, Payment.status == previous_status)
+                .values(status="capturing")
+                .returning(Payment.id)
+            )
+        await db.commit()
+        if claimed is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Payment is {previous_status} and cannot be captured"
+            )
+        return payment_id, previous_status
+
+    @staticmethod
+    async def finish_capture(db: AsyncSession, payment_id: uuid.UUID, new_status: str, capture_id: Optional[str]):
+        # Guarded on `capturing`: a webhook that already settled the payment wins
+        await db.execute(
+            update(Payment)
+            .where(Payment.id == payment_id, Payment.status == "capturing")
+            .values(status=new_status, paypal_payment_id=capture_id)
+        )
+        await db.commit()
+
+    @staticmethod
+    async def abort_capture(db: AsyncSession, payment_id: uuid.UUID, previous_status: str):
+        await db.execute(
+            update(Payment)
+            .where(Payment.id == payment_id, Payment.status == "capturing")
+            .values(status=previous_status)
+        )
+        await db.commit()
+
+
+def capture_id_from(capture_data: dict) -> Optional[str]:
+    for unit in capture_data.get("purchase_units", []):
+        for capture in (unit.get("payments") or {}).get("captures", []):
+            return capture.get("id")
+    return None
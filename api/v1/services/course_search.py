@@ -0,0 +1,102 @@
+# api/v1/services/course_search.py
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import func, or_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from api.v1.models.course import Course
+
+# Must match the configuration used by the courses.search_vector generated column
+SEARCH_CONFIG = "english"
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Field weights mirror setweight() A/B/C in the search_vector definition
+_FIELD_WEIGHTS = {"name": 1.0, "summary": 0.4, "description": 0.2}
+
+# Whether the database has pg_trgm; looked up once per process
+_trigram_available: Optional[bool] = None
+
+
+async def trigram_available(db: AsyncSession) -> bool:
+    global _trigram_available
+    if _trigram_available is None:
+        _trigram_available = await db.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        )
+    return _trigram_available
+
+
+def apply_search(query: Select, search: str, trigram: bool = True) -> Select:
+    """
+    Filter and rank a Course query with the GIN-indexed tsvector, falling back
+    to trigram similarity on the name so typos still match. Without pg_trgm
+    the name is matched with a substring ILIKE instead.
+    """
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, search)
+    rank = func.ts_rank_cd(Course.search_vector, ts_query)
+    if not trigram:
+        return (
+            query
+            .filter(or_(Course.search_vector.op("@@")(ts_query), Course.name.icontains(search, autoescape=True)))
+            .order_by(rank.desc(), Course.id)
+        )
+    similarity = func.similarity(Course.name, search)
+    return (
+        query
+        .filter(or_(Course.search_vector.op("@@")(ts_query), Course.name.op("%")(search)))
+        .order_by(rank.desc(), similarity.desc(), Course.id)
+    )
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class InMemoryCourseSearch:
+    """
+    Small inverted index over course text for databases without tsvector
+    support (e.g. SQLite in local runs). Ranking is weighted TF-IDF over the
+    same fields and weights as the Postgres index.
+    """
+
+    def __init__(self, courses: Iterable[Course]):
+        self._courses: Dict[int, Course] = {}
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        for course in courses:
+            self.add(course)
+
+    def add(self, course: Course):
+        self._courses[course.id] = course
+        weights: Counter = Counter()
+        for field, weight in _FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(course, field)):
+                weights[token] += weight
+        for token, weight in weights.items():
+            self._postings[token][course.id] = weight
+
+    def search(self, search: str) -> List[Course]:
+        terms = tokenize(search)
+        if not terms:
+            return []
+
+        total = len(self._courses)
+        scores: Counter = Counter()
+        for term in terms:
+            # Prefix match keeps partial words ("mach" -> "machine") working
+            matches = [token for token in self._postings if token.startswith(term)]
+            for token in matches:
+                postings = self._postings[token]
+                idf = math.log(1 + total / len(postings))
+                for course_id, weight in postings.items():
+                    scores[course_id] += weight * idf
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [self._courses[course_id] for course_id, _ in ranked]
+
+
+def search_in_memory(courses: Sequence[Course], search: str) -> List[Course]:
+    return InMemoryCourseSearch(courses).search(search)
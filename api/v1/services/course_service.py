@@ -1,21 +1,140 @@
+import base64
+import json
+import uuid
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import literal, true
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from api.v1.models.course import Course
+from api.v1.models.enrollment import Enrollment
+from api.db.writes import update_where
+from api.v1.services.catalog_cache import catalog_cache
+from api.v1.services.course_search import apply_search, search_in_memory, trigram_available
 from fastapi import HTTPException
 
+# Columns a client may request through `fields=`; search_vector is internal
+COURSE_FIELDS = {
+    column.key: getattr(Course, column.key)
+    for column in Course.__table__.columns
+    if column.key != "search_vector"
+}
+
+
+def encode_cursor(position: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> dict:
+    if not cursor:
+        return {}
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Ids and offsets are never negative; Postgres rejects a negative OFFSET
+    if not isinstance(position, dict) or not all(
+        isinstance(value, int) and not isinstance(value, bool) and value >= 0
+        for value in position.values()
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position
+
+
+def parse_ids(ids: Optional[str], max_ids: int) -> Optional[List[int]]:
+    if not ids:
+        return None
+    try:
+        parsed = sorted({int(value) for value in ids.split(",") if value.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if len(parsed) > max_ids:
+        raise HTTPException(status_code=400, detail=f"At most {max_ids} ids may be requested at once")
+    return parsed
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in COURSE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown course fields: {', '.join(unknown)}")
+    # id is always returned; it is what the cursor is built from
+    return ["id"] + [name for name in names if name != "id"]
+
+
 class CourseService:
     @staticmethod
     async def get_all_courses(db: AsyncSession, category: str | None = None, search: str | None = None):
         query = select(Course)
         if category:
             query = query.filter(Course.category == category)
+        if search and db.bind.dialect.name != "postgresql":
+            result = await db.execute(query)
+            return search_in_memory(result.scalars().all(), search)
         if search:
-            query = query.filter(
-                (Course.name.ilike(f"%{search}%")) | (Course.description.ilike(f"%{search}%"))
-            )
+            query = apply_search(query, search, await trigram_available(db))
         result = await db.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    async def get_courses_page(
+        db: AsyncSession,
+        category: str | None = None,
+        search: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+        fields: List[str] | None = None,
+        ids: List[int] | None = None,
+    ) -> Tuple[list, Optional[str]]:
+        """
+        Return one page of courses and the cursor for the next page.
+
+        Plain listings use keyset pagination on id. Search results are ordered
+        by relevance, which has no stable key to seek on, so their cursor
+        carries an offset instead.
+        """
+        position = decode_cursor(cursor)
+
+        if search and db.bind.dialect.name != "postgresql":
+            courses = await CourseService.get_all_courses(db, category, search)
+            if ids:
+                courses = [course for course in courses if course.id in ids]
+            offset = position.get("offset", 0)
+            rows = courses[offset:offset + limit + 1]
+            if fields:
+                rows = [{name: getattr(course, name) for name in fields} for course in rows]
+            next_cursor = encode_cursor({"offset": offset + limit}) if len(rows) > limit else None
+            return rows[:limit], next_cursor
+
+        query = select(*[COURSE_FIELDS[name] for name in fields]) if fields else select(Course)
+        if ids:
+            query = query.filter(Course.id.in_(ids))
+        if category:
+            query = query.filter(Course.category == category)
+
+        if search:
+            offset = position.get("offset", 0)
+            query = apply_search(query, search, await trigram_available(db)).offset(offset)
+            next_position = {"offset": offset + limit}
+        else:
+            if "id" in position:
+                query = query.filter(Course.id > position["id"])
+            query = query.order_by(Course.id)
+            next_position = None
+
+        result = await db.execute(query.limit(limit + 1))
+        rows = [dict(row) for row in result.mappings()] if fields else list(result.scalars())
+
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        if next_position is None:
+            last = rows[-1]
+            next_position = {"id": last["id"] if fields else last.id}
+        return rows, encode_cursor(next_position)
+
     @staticmethod
     async def get_course_by_id(db: AsyncSession, course_id: int):
         query = select(Course).filter(Course.id == course_id)
@@ -23,4 +142,73 @@ class CourseService:
         course = result.scalars().first()
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
-        return course
\ No newline at end of file
+        return course
+
+    @staticmethod
+    async def create_course(db: AsyncSession, values: dict) -> Course:
+        course = Course(**values)
+        db.add(course)
+        await db.commit()
+        await catalog_cache.invalidate()
+        return course
+
+    @staticmethod
+    async def update_course(db: AsyncSession, course_id: int, values: dict):
+        if not await update_where(db, Course, Course.id == course_id, values=values):
+            raise HTTPException(status_code=404, detail="Course not found")
+        await catalog_cache.invalidate()
+
+    @staticmethod
+    async def seed_courses(db: AsyncSession, courses: Iterable[dict]) -> int:
+        """Insert or overwrite courses by id in one statement."""
+        rows = list(courses)
+        if not rows:
+            return 0
+        stmt = pg_insert(Course.__table__).values(rows)
+        columns = {key for row in rows for key in row if key != "id"}
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["id"], set_={key: stmt.excluded[key] for key in columns}
+        ))
+        await db.commit()
+        await catalog_cache.invalidate()
+        return len(rows)
+
+    @staticmethod
+    async def enroll_user(db: AsyncSession, user_id: uuid.UUID, course_id: int) -> Tuple[str, bool]:
+        """
+        Enroll a user in one statement:
+
+            WITH course AS (SELECT id, name FROM courses WHERE id = :course_id),
+                 inserted AS (INSERT INTO enrollments ... SELECT ... FROM course
+                              ON CONFLICT (user_id, course_id) DO NOTHING RETURNING id)
+            SELECT course.name, inserted.id FROM course LEFT JOIN inserted ON true
+
+        Returns (course name, created). The unique key makes concurrent
+        requests safe: exactly one of them inserts, the rest see created=False.
+        Raises 404 if the course does not exist.
+        """
+        course = select(Course.id, Course.name).where(Course.id == course_id).cte("course")
+        enrollments = Enrollment.__table__
+        inserted = (
+            pg_insert(enrollments)
+            .from_select(
+                ["id", "user_id", "course_id", "progress"],
+                select(
+                    literal(uuid.uuid4(), UUID(as_uuid=True)),
+                    literal(user_id, UUID(as_uuid=True)),
+                    course.c.id,
+                    literal(0.0),
+                )
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+            .returning(enrollments.c.id)
+            .cte("inserted")
+        )
+        result = await db.execute(
+            select(course.c.name, inserted.c.id).select_from(course.outerjoin(inserted, true()))
+        )
+        row = result.one_or_none()
+        await db.commit()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return row.name, row.id is not None
\ No newline at end of file
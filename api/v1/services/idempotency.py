@@ -0,0 +1,23 @@
+# api/v1/services/idempotency.py
+import json
+from typing import Optional
+
+from api.db.redis import get_redis
+from core.config.settings import settings
+
+
+def _key(scope: str, idempotency_key: str) -> str:
+    return f"idempotency:{scope}:{idempotency_key}"
+
+
+async def get_stored_response(scope: str, idempotency_key: str) -> Optional[dict]:
+    """Return the response recorded for this Idempotency-Key, if any."""
+    raw = await get_redis().get(_key(scope, idempotency_key))
+    return json.loads(raw) if raw else None
+
+
+async def store_response(scope: str, idempotency_key: str, response: dict):
+    await get_redis().set(
+        _key(scope, idempotency_key), json.dumps(response),
+        ex=settings.IDEMPOTENCY_KEY_TTL_SECONDS, nx=True
+    )
@@ -0,0 +1,157 @@
+# api/v1/services/media_storage.py
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image
+
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes -> extension for the image types we accept
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    for signature, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+class MediaStorage:
+    """
+    Streams uploads to a staging file, validating type and size as bytes
+    arrive, then moves them to a content-addressed path
+    (<root>/<kind>/<sha256>.<ext>). Thumbnails are generated in a small
+    worker pool so image decoding never runs on the event loop.
+
+    The staging directory must sit outside the served root, so unvalidated
+    uploads are never reachable over HTTP, and on the same filesystem, so
+    promotion is an atomic rename. By default it is a sibling of the root.
+    """
+
+    def __init__(self, root: str, thumbnail_workers: int, staging_dir: Optional[str] = None):
+        self.root = root
+        if staging_dir is None:
+            absolute_root = os.path.abspath(root)
+            staging_dir = os.path.join(os.path.dirname(absolute_root), f".{os.path.basename(absolute_root)}-staging")
+        self.staging_dir = staging_dir
+        self._thumbnail_workers = thumbnail_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._thumbnail_workers,
+                thread_name_prefix="thumbnailer"
+            )
+        return self._executor
+
+    async def save_image(self, file: UploadFile, kind: str, max_bytes: int) -> Tuple[str, Dict[int, str]]:
+        """Store an uploaded image; returns (relative path, {size: thumbnail path})."""
+        await anyio.to_thread.run_sync(lambda: os.makedirs(self.staging_dir, exist_ok=True))
+        staging_path = os.path.join(self.staging_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        extension = None
+
+        try:
+            async with await anyio.open_file(staging_path, "wb") as staging:
+                while chunk := await file.read(CHUNK_SIZE):
+                    if extension is None:
+                        extension = sniff_image_type(chunk)
+                        if extension is None:
+                            raise HTTPException(
+                                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                                detail="Only JPEG, PNG, GIF and WebP images are allowed"
+                            )
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB limit"
+                        )
+                    digest.update(chunk)
+                    await staging.write(chunk)
+
+            if extension is None:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file")
+
+            relative_path = os.path.join(kind, f"{digest.hexdigest()}.{extension}")
+            final_path = os.path.join(self.root, relative_path)
+            await anyio.to_thread.run_sync(self._promote, staging_path, final_path)
+        finally:
+            await anyio.to_thread.run_sync(self._discard, staging_path)
+
+        thumbnails = await self._make_thumbnails(final_path)
+        return relative_path, thumbnails
+
+    @staticmethod
+    def _promote(staging_path: str, final_path: str):
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        if os.path.exists(final_path):
+            return  # identical content already stored
+        os.replace(staging_path, final_path)
+
+    @staticmethod
+    def _discard(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def _make_thumbnails(self, path: str) -> Dict[int, str]:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), self._render_thumbnails, path, tuple(settings.MEDIA_THUMBNAIL_SIZES)
+        )
+
+    def _render_thumbnails(self, path: str, sizes: Tuple[int, ...]) -> Dict[int, str]:
+        stem, _ = os.path.splitext(path)
+        thumbnails = {}
+        try:
+            with Image.open(path) as image:
+                image = image.convert("RGB")
+                for edge in sizes:
+                    target = f"{stem}_{edge}.jpg"
+                    if not os.path.exists(target):
+                        thumbnail = image.copy()
+                        thumbnail.thumbnail((edge, edge))
+                        thumbnail.save(target, "JPEG", quality=85, optimize=True)
+                    thumbnails[edge] = os.path.relpath(target, self.root)
+        except (OSError, Image.DecompressionBombError) as e:
+            logger.warning(f"Could not create thumbnails for {path}: {e}")
+        return thumbnails
+
+    @staticmethod
+    def url_for(relative_path: str) -> str:
+        """Public URL of a stored file, as served by the MEDIA_URL mount."""
+        return f"{settings.MEDIA_URL.rstrip('/')}/{relative_path.replace(os.sep, '/')}"
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+media_storage = MediaStorage(
+    root=settings.MEDIA_ROOT,
+    thumbnail_workers=settings.MEDIA_THUMBNAIL_WORKERS,
+    staging_dir=settings.MEDIA_STAGING_DIR
+)
@@ -1,21 +1,72 @@
 # api/v1/services/payment.py
+import asyncio
 import os
+import time
+import uuid
 import httpx
 from core.config.settings import settings
-from typing import Dict, Optional
+from api.v1.services.paypal_resilience import (
+    PayPalRequestError, PayPalUnavailableError, paypal_breaker, paypal_operation_stats, retry_delay,
+)
+from typing import Awaitable, Callable, Dict, Optional
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401  # enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide keep-alive client so PayPal calls reuse TCP/TLS connections."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=settings.PAYPAL_HTTP2 and HTTP2_AVAILABLE,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=settings.PAYPAL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PAYPAL_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.PAYPAL_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _error_issue(response: httpx.Response) -> Optional[str]:
+    """The first details[].issue of a PayPal error body, e.g. ORDER_ALREADY_CAPTURED."""
+    try:
+        return response.json()["details"][0]["issue"]
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
 class PayPalService:
     def __init__(self):
         self.client_id = settings.PAYPAL_CLIENT_ID
         self.client_secret = settings.PAYPAL_CLIENT_SECRET
-        self.base_url = "https://api-m.sandbox.paypal.com"  # Sandbox
-        # self.base_url = "https://api-m.paypal.com"  # Production
+        self.base_url = settings.PAYPAL_BASE_URL.rstrip("/")
         self.access_token = None
-    
+        self.token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+
+    def _token_is_fresh(self) -> bool:
+        # Refresh proactively a little before PayPal's expires_in runs out
+        return bool(self.access_token) and time.monotonic() < self.token_expires_at - settings.PAYPAL_TOKEN_REFRESH_MARGIN
+
     async def get_access_token(self) -> str:
         """Get PayPal access token"""
         try:
@@ -24,24 +75,29 @@ class PayPalService:
             data = {"grant_type": "client_credentials"}
             headers = {"Accept": "application/json", "Accept-Language": "en_US"}
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
+            response = await self._call(
+                "get_access_token",
+                lambda timeout: get_http_client().post(
                     f"{self.base_url}/v1/oauth2/token",
                     auth=auth,
                     data=data,
                     headers=headers,
-                    timeout=30.0
-                )
+                    timeout=timeout
+                ),
+            )
             
             response.raise_for_status()
             token_data = response.json()
             self.access_token = token_data["access_token"]
+            self.token_expires_at = time.monotonic() + int(token_data.get("expires_in", 0))
             logger.info("Successfully obtained PayPal access token")
             return self.access_token
             
+        except PayPalUnavailableError:
+            raise
         except httpx.HTTPError as e:
             error_detail = f"HTTP error getting PayPal access token: {e}"
-            if e.response:
+            if getattr(e, "response", None) is not None:
                 error_detail += f"\nStatus: {e.response.status_code}"
                 error_detail += f"\nResponse: {e.response.text}"
             logger.error(error_detail)
@@ -49,20 +105,113 @@ class PayPalService:
         except Exception as e:
             logger.error(f"Error getting PayPal access token: {e}")
             raise Exception(f"Failed to get PayPal access token: {e}")
+
+    async def ensure_access_token(self) -> str:
+        """Return the cached token, letting only one caller refresh it at a time."""
+        if self._token_is_fresh():
+            return self.access_token
+        async with self._token_lock:
+            if not self._token_is_fresh():
+                await self.get_access_token()
+        return self.access_token
+
+    def invalidate_access_token(self):
+        self.access_token = None
+        self.token_expires_at = 0.0
     
     async def get_headers(self) -> Dict:
         """Get headers with authorization"""
-        if not self.access_token:
-            await self.get_access_token()
-        
+        return self._auth_headers(await self.ensure_access_token())
+
+    @staticmethod
+    def _auth_headers(access_token: str) -> Dict:
         return {
             "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.access_token}",
+            "Authorization": f"Bearer {access_token}",
             "Prefer": "return=representation"
         }
+
+    async def _call(
+        self,
+        operation: str,
+        send: Callable[[httpx.Timeout], Awaitable[httpx.Response]],
+        retryable: bool = True,
+    ) -> httpx.Response:
+        """
+        Run `send` within the operation's latency budget behind the circuit
+        breaker, retrying timeouts, connection errors, 429 and 5xx with
+        jittered backoff while the budget allows. Raises PayPalUnavailableError
+        when PayPal is failing rather than letting the caller wait it out.
+        """
+        deadline = time.monotonic() + settings.PAYPAL_LATENCY_BUDGETS.get(operation, 10.0)
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                paypal_operation_stats.record(operation, "budget_exhausted")
+                raise PayPalUnavailableError(f"PayPal {operation} exceeded its latency budget")
+            try:
+                paypal_breaker.before_call()
+            except PayPalUnavailableError:
+                paypal_operation_stats.record(operation, "rejected")
+                raise
+
+            paypal_operation_stats.record(operation, "attempts")
+            start = time.perf_counter()
+            try:
+                response = await send(httpx.Timeout(remaining, connect=min(settings.PAYPAL_CONNECT_TIMEOUT, remaining)))
+                error = None if response.status_code != 429 and response.status_code < 500 else f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            except BaseException:
+                paypal_breaker.record_aborted()
+                raise
+            elapsed = time.perf_counter() - start
+
+            if error is None:
+                paypal_breaker.record_success()
+                paypal_operation_stats.record(operation, "succeeded", elapsed)
+                return response
+
+            paypal_breaker.record_failure()
+            delay = retry_delay(attempt)
+            if not retryable or attempt >= settings.PAYPAL_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                paypal_operation_stats.record(operation, "failed", elapsed)
+                raise PayPalUnavailableError(f"PayPal {operation} failed after {attempt + 1} attempt(s): {error}")
+            logger.warning(f"PayPal {operation} attempt {attempt + 1} failed ({error}), retrying in {delay:.2f}s")
+            paypal_operation_stats.record(operation, "retries")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _request(self, operation: str, method: str, path: str, request_id: Optional[str] = None, **kwargs) -> httpx.Response:
+        """
+        Send an authorized request, refreshing the token once if PayPal rejects
+        it. POSTs are only retried with a PayPal-Request-Id, which makes PayPal
+        replay the first result instead of creating or capturing twice.
+        """
+        retryable = method == "GET" or request_id is not None
+        for refreshed in (False, True):
+            # Fetch the token before `_call`, never inside `send`: a refresh
+            # there would be a breaker call nested in this one, and in
+            # half-open the probe's own refresh would be rejected
+            headers = await self.get_headers()
+            if request_id:
+                headers["PayPal-Request-Id"] = request_id
+            response = await self._call(
+                operation,
+                lambda timeout: get_http_client().request(
+                    method, f"{self.base_url}{path}", headers=headers, timeout=timeout, **kwargs
+                ),
+                retryable=retryable,
+            )
+            if response.status_code != 401 or refreshed:
+                return response
+            # PayPal revoked the token before expires_in; nothing was applied, so resend once
+            self.invalidate_access_token()
     
     async def create_order(self, amount: float, currency: str = "USD", 
-                         course_id: str = None, user_id: str = None) -> Dict:
+                         course_id: str = None, user_id: str = None,
+                         request_id: Optional[str] = None) -> Dict:
         """Create a PayPal order"""
         try:
             payload = {
@@ -84,17 +233,12 @@ class PayPalService:
                 }
             }
             
-            headers = await self.get_headers()
-            
             logger.info(f"Creating PayPal order with payload: {json.dumps(payload, indent=2)}")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v2/checkout/orders",
-                    json=payload,
-                    headers=headers,
-                    timeout=30.0
-                )
+            response = await self._request(
+                "create_order", "POST", "/v2/checkout/orders",
+                request_id=request_id or str(uuid.uuid4()), json=payload
+            )
             
             # Log the full response for debugging
             logger.info(f"PayPal API response status: {response.status_code}")
@@ -105,9 +249,11 @@ class PayPalService:
             logger.info(f"Successfully created PayPal order: {order_data.get('id')}")
             return order_data
             
+        except PayPalUnavailableError:
+            raise
         except httpx.HTTPError as e:
             error_detail = f"HTTP error creating PayPal order: {e}"
-            if e.response:
+            if getattr(e, "response", None) is not None:
                 error_detail += f"\nStatus: {e.response.status_code}"
                 error_detail += f"\nResponse: {e.response.text}"
             logger.error(error_detail)
@@ -116,29 +262,33 @@ class PayPalService:
             logger.error(f"Error creating PayPal order: {e}")
             raise Exception(f"Failed to create PayPal order: {e}")
     
-    async def capture_order(self, order_id: str) -> Dict:
+    async def capture_order(self, order_id: str, request_id: Optional[str] = None) -> Dict:
         """Capture a PayPal payment"""
         try:
-            headers = await self.get_headers()
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v2/checkout/orders/{order_id}/capture",
-                    headers=headers,
-                    timeout=30.0
-                )
+            response = await self._request(
+                "capture_order", "POST", f"/v2/checkout/orders/{order_id}/capture",
+                request_id=request_id or str(uuid.uuid4())
+            )
             
             response.raise_for_status()
             capture_data = response.json()
             logger.info(f"Successfully captured PayPal order: {order_id}")
             return capture_data
             
+        except PayPalUnavailableError:
+            raise
         except httpx.HTTPError as e:
             error_detail = f"HTTP error capturing PayPal order: {e}"
-            if e.response:
+            if getattr(e, "response", None) is not None:
                 error_detail += f"\nStatus: {e.response.status_code}"
                 error_detail += f"\nResponse: {e.response.text}"
             logger.error(error_detail)
+            if getattr(e, "response", None) is not None:
+                raise PayPalRequestError(
+                    f"Failed to capture PayPal payment: {error_detail}",
+                    e.response.status_code,
+                    _error_issue(e.response),
+                )
             raise Exception(f"Failed to capture PayPal payment: {error_detail}")
         except Exception as e:
             logger.error(f"Error capturing PayPal order: {e}")
@@ -147,25 +297,27 @@ class PayPalService:
     async def get_order(self, order_id: str) -> Dict:
         """Get order details"""
         try:
-            headers = await self.get_headers()
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v2/checkout/orders/{order_id}",
-                    headers=headers,
-                    timeout=30.0
-                )
+            response = await self._request("get_order", "GET", f"/v2/checkout/orders/{order_id}")
             
             response.raise_for_status()
             return response.json()
             
+        except PayPalUnavailableError:
+            raise
         except httpx.HTTPError as e:
             error_detail = f"HTTP error getting PayPal order: {e}"
-            if e.response:
+            if getattr(e, "response", None) is not None:
                 error_detail += f"\nStatus: {e.response.status_code}"
                 error_detail += f"\nResponse: {e.response.text}"
             logger.error(error_detail)
             raise Exception(f"Failed to get PayPal order details: {error_detail}")
         except Exception as e:
             logger.error(f"Error getting PayPal order: {e}")
-            raise Exception(f"Failed to get PayPal order details: {e}")
\ No newline at end of file
+            raise Exception(f"Failed to get PayPal order details: {e}")
+
+
+paypal_service = PayPalService()
+
+
+def get_paypal_service() -> PayPalService:
+    return paypal_service
\ No newline at end of file
@@ -0,0 +1,132 @@
+# api/v1/services/paypal_resilience.py
+import logging
+import random
+import time
+from typing import Dict, Optional
+
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class PayPalUnavailableError(Exception):
+    """PayPal is failing or too slow; raised instead of waiting on it."""
+
+
+class PayPalRequestError(Exception):
+    """PayPal answered and refused the request (4xx): the outcome is known."""
+
+    def __init__(self, message: str, status_code: int, issue: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.issue = issue
+
+
+class CircuitBreaker:
+    """
+    Per-worker circuit breaker for PayPal calls.
+
+    After `failure_threshold` consecutive upstream failures (timeouts,
+    connection errors, 429/5xx) the circuit opens and calls fail fast for
+    `reset_seconds`. Then up to `half_open_max_calls` probes are let through:
+    a success closes the circuit, a failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, half_open_max_calls: int):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._transitions: Dict[str, int] = {}
+        self._rejected = 0
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        key = f"{self.state}->{state}"
+        self._transitions[key] = self._transitions.get(key, 0) + 1
+        logger.warning(f"PayPal circuit breaker {key}")
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        self._probes = 0
+
+    def before_call(self):
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                self._rejected += 1
+                raise PayPalUnavailableError("PayPal circuit is open")
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                self._rejected += 1
+                raise PayPalUnavailableError("PayPal circuit is half-open")
+            self._probes += 1
+
+    def record_success(self):
+        self._failures = 0
+        self._transition(CLOSED)
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._transition(OPEN)
+
+    def record_aborted(self):
+        """The call ended without a verdict on PayPal's health (e.g. cancelled)."""
+        if self.state == HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "rejected": self._rejected,
+            "transitions": dict(self._transitions),
+        }
+
+
+class OperationStats:
+    """Attempt, retry and outcome counters per PayPal operation."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    def record(self, operation: str, event: str, elapsed: Optional[float] = None):
+        stats = self._metrics.setdefault(
+            operation,
+            {"attempts": 0, "retries": 0, "succeeded": 0, "failed": 0, "budget_exhausted": 0, "rejected": 0,
+             "total_seconds": 0.0, "max_seconds": 0.0},
+        )
+        stats[event] += 1
+        if elapsed is not None:
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+    def stats(self) -> Dict:
+        return {operation: dict(stats) for operation, stats in self._metrics.items()}
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter, like the email worker's retries."""
+    delay = min(settings.PAYPAL_RETRY_BASE_SECONDS * (2 ** attempt), settings.PAYPAL_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+paypal_breaker = CircuitBreaker(
+    settings.PAYPAL_BREAKER_FAILURE_THRESHOLD,
+    settings.PAYPAL_BREAKER_RESET_SECONDS,
+    settings.PAYPAL_BREAKER_HALF_OPEN_MAX_CALLS,
+)
+paypal_operation_stats = OperationStats()
+
+
+def get_paypal_stats() -> Dict:
+    return {"circuit_breaker": paypal_breaker.stats(), "operations": paypal_operation_stats.stats()}
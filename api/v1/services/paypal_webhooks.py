@@ -0,0 +1,159 @@
+# api/v1/services/paypal_webhooks.py
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Mapping, Optional
+
+from cachetools import TTLCache
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from fastapi import HTTPException
+
+from api.db.redis import get_redis
+from api.v1.services.payment import get_http_client
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "paypal:webhooks"
+GROUP = "payments"
+METRICS_KEY = "paypal:webhooks:metrics"
+
+
+def seen_key(event_id: str) -> str:
+    return f"paypal:webhooks:seen:{event_id}"
+
+
+class WebhookVerificationError(Exception):
+    pass
+
+
+class WebhookVerifier:
+    """
+    Verify PayPal webhook signatures without calling verify-webhook-signature.
+
+    PayPal signs "<transmission id>|<transmission time>|<webhook id>|<crc32 of
+    body>" with SHA256withRSA. The signing cert is fetched once per URL (only
+    from PayPal hosts, over TLS) and cached, so steady-state verification is
+    a local RSA check.
+    """
+
+    def __init__(self, webhook_id: Optional[str], cert_url_prefixes, cert_ttl: int, tolerance: int):
+        self.webhook_id = webhook_id
+        self.cert_url_prefixes = tuple(cert_url_prefixes)
+        self.tolerance = tolerance
+        self._certs: TTLCache = TTLCache(maxsize=32, ttl=cert_ttl)
+        self._lock = asyncio.Lock()
+
+    async def _get_cert(self, url: str) -> x509.Certificate:
+        if not url.startswith(self.cert_url_prefixes):
+            raise WebhookVerificationError(f"Untrusted cert URL: {url}")
+        cert = self._certs.get(url)
+        if cert is not None:
+            return cert
+        async with self._lock:
+            cert = self._certs.get(url)
+            if cert is None:
+                response = await get_http_client().get(url, timeout=10.0)
+                response.raise_for_status()
+                cert = x509.load_pem_x509_certificate(response.content)
+                self._certs[url] = cert
+                logger.info(f"Cached PayPal webhook cert {url}")
+        return cert
+
+    def _check_time(self, transmission_time: str):
+        try:
+            sent_at = datetime.fromisoformat(transmission_time.replace("Z", "+00:00"))
+        except ValueError:
+            raise WebhookVerificationError("Invalid transmission time")
+        if sent_at.tzinfo is None:
+            sent_at = sent_at.replace(tzinfo=timezone.utc)
+        if abs((datetime.now(timezone.utc) - sent_at).total_seconds()) > self.tolerance:
+            raise WebhookVerificationError("Transmission time outside tolerance")
+
+    async def verify(self, headers: Mapping[str, str], body: bytes):
+        if not self.webhook_id:
+            raise WebhookVerificationError("PAYPAL_WEBHOOK_ID is not configured")
+        try:
+            transmission_id = headers["paypal-transmission-id"]
+            transmission_time = headers["paypal-transmission-time"]
+            signature = base64.b64decode(headers["paypal-transmission-sig"], validate=True)
+            cert_url = headers["paypal-cert-url"]
+            auth_algo = headers.get("paypal-auth-algo", "SHA256withRSA")
+        except (KeyError, binascii.Error):
+            raise WebhookVerificationError("Missing or malformed PayPal signature headers")
+        if auth_algo != "SHA256withRSA":
+            raise WebhookVerificationError(f"Unsupported auth algorithm: {auth_algo}")
+        self._check_time(transmission_time)
+
+        cert = await self._get_cert(cert_url)
+        now = datetime.now(timezone.utc)
+        if not cert.not_valid_before_utc <= now <= cert.not_valid_after_utc:
+            self._certs.pop(cert_url, None)
+            raise WebhookVerificationError("PayPal cert is not currently valid")
+
+        message = f"{transmission_id}|{transmission_time}|{self.webhook_id}|{zlib.crc32(body)}".encode()
+        try:
+            cert.public_key().verify(signature, message, padding.PKCS1v15(), hashes.SHA256())
+        except InvalidSignature:
+            raise WebhookVerificationError("Invalid webhook signature")
+
+
+webhook_verifier = WebhookVerifier(
+    settings.PAYPAL_WEBHOOK_ID,
+    settings.PAYPAL_CERT_URL_PREFIXES,
+    settings.PAYPAL_CERT_CACHE_TTL_SECONDS,
+    settings.PAYPAL_WEBHOOK_TOLERANCE_SECONDS,
+)
+
+
+async def ingest_webhook(headers: Mapping[str, str], body: bytes) -> str:
+    """
+    Verify a webhook delivery and append it to the Redis stream consumed by
+    api/workers/paypal_webhook_worker.py. Returns the event id.
+    """
+    try:
+        await webhook_verifier.verify(headers, body)
+    except WebhookVerificationError as e:
+        logger.warning(f"Rejected PayPal webhook: {e}")
+        await get_redis().hincrby(METRICS_KEY, "rejected", 1)
+        raise HTTPException(status_code=400, detail="Invalid webhook signature")
+    try:
+        event = json.loads(body)
+        event_id = event["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Malformed webhook event")
+
+    async with get_redis().pipeline(transaction=False) as pipe:
+        pipe.xadd(
+            STREAM_KEY,
+            {"event_id": event_id, "body": body},
+            maxlen=settings.PAYPAL_WEBHOOK_STREAM_MAXLEN,
+            approximate=True,
+        )
+        pipe.hincrby(METRICS_KEY, "received", 1)
+        await pipe.execute()
+    return event_id
+
+
+async def get_webhook_stats() -> Dict:
+    redis = get_redis()
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.xlen(STREAM_KEY)
+        pipe.hgetall(METRICS_KEY)
+        length, metrics = await pipe.execute()
+    try:
+        pending = (await redis.xpending(STREAM_KEY, GROUP))["pending"]
+    except Exception:
+        pending = 0  # the consumer group is created when the worker first starts
+    return {
+        "stream_length": length,
+        "pending": pending,
+        **{name: int(metrics.get(name, 0)) for name in ("received", "rejected", "processed", "duplicates", "ignored", "batches")},
+    }
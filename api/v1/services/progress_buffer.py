@@ -0,0 +1,180 @@
+# api/v1/services/progress_buffer.py
+import asyncio
+import logging
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy import Float, Integer, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.db.redis import COMPARE_AND_DELETE, get_redis
+from api.db.session import async_session
+from api.v1.models.enrollment import Enrollment
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "progress:pending"
+FLUSHING_KEY = "progress:flushing"
+FLUSH_LOCK_KEY = "progress:flush_lock"
+
+# Keep the highest value reported for a (user, course) until the next flush
+_SET_MAX = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if not current or tonumber(ARGV[2]) > tonumber(current) then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+end
+return 1
+"""
+
+# Move pending updates aside for flushing; a leftover batch from a crashed flush goes first
+_CLAIM_BATCH = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 1
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    return 1
+end
+return 0
+"""
+
+
+def _field(user_id, course_id) -> str:
+    return f"{user_id}:{course_id}"
+
+
+class ProgressBuffer:
+    """
+    Coalesces progress reports in Redis and writes them to Postgres in
+    batched UPDATE ... FROM (VALUES ...) statements on an interval.
+
+    Progress only moves forward. Reads overlay buffered values (see
+    pending_for) so a learner always sees their highest report even before
+    it is flushed.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._enrolled: TTLCache = TTLCache(maxsize=50000, ttl=600)
+        self._task: Optional[asyncio.Task] = None
+
+    async def is_enrolled(self, db: AsyncSession, user_id, course_id: int) -> bool:
+        key = (str(user_id), course_id)
+        if key in self._enrolled:
+            return True
+        result = await db.execute(
+            select(Enrollment.id).where(Enrollment.user_id == user_id, Enrollment.course_id == course_id).limit(1)
+        )
+        if result.first() is None:
+            return False
+        self._enrolled[key] = True
+        return True
+
+    async def record(self, user_id, course_id: int, progress: float):
+        await get_redis().eval(_SET_MAX, 1, PENDING_KEY, _field(user_id, course_id), progress)
+
+    async def pending_for(self, user_id, course_ids: Iterable[int]) -> Dict[int, float]:
+        course_ids = list(course_ids)
+        if not course_ids:
+            return {}
+        fields = [_field(user_id, course_id) for course_id in course_ids]
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.hmget(PENDING_KEY, fields)
+            pipe.hmget(FLUSHING_KEY, fields)
+            pending, flushing = await pipe.execute()
+
+        overlay = {}
+        for course_id, newest, in_flight in zip(course_ids, pending, flushing):
+            value = newest if newest is not None else in_flight
+            if value is not None:
+                overlay[course_id] = float(value)
+        return overlay
+
+    async def flush(self) -> int:
+        redis = get_redis()
+        # One worker flushes at a time; the lock expires if that worker dies.
+        # The token makes sure a flush that overran the TTL can't release
+        # the lock another worker has since taken.
+        lock_token = uuid.uuid4().hex
+        if not await redis.set(FLUSH_LOCK_KEY, lock_token, nx=True, ex=max(int(self.interval * 6), 30)):
+            return 0
+        try:
+            if not await redis.eval(_CLAIM_BATCH, 2, PENDING_KEY, FLUSHING_KEY):
+                return 0
+            entries = await redis.hgetall(FLUSHING_KEY)
+            rows = self._parse(entries)
+            async with async_session() as db:
+                for start in range(0, len(rows), self.batch_size):
+                    await self._write(db, rows[start:start + self.batch_size])
+                await db.commit()
+            await redis.delete(FLUSHING_KEY)
+            return len(rows)
+        finally:
+            await redis.eval(COMPARE_AND_DELETE, 1, FLUSH_LOCK_KEY, lock_token)
+
+    @staticmethod
+    def _parse(entries: Dict[str, str]) -> List[Tuple[uuid.UUID, int, float]]:
+        rows = []
+        for field, value in entries.items():
+            try:
+                user_id, course_id = field.rsplit(":", 1)
+                rows.append((uuid.UUID(user_id), int(course_id), float(value)))
+            except ValueError:
+                logger.warning(f"Dropping malformed progress entry {field!r}={value!r}")
+        return rows
+
+    @staticmethod
+    async def _write(db: AsyncSession, rows: List[Tuple[uuid.UUID, int, float]]):
+        batch = values(
+            column("user_id", UUID(as_uuid=True)),
+            column("course_id", Integer),
+            column("progress", Float),
+            name="batch",
+        ).data(rows)
+        enrollments = Enrollment.__table__
+        # _SET_MAX only coalesces within one flush window; a lower report
+        # after a flush must not lower what is already stored either
+        await db.execute(
+            update(enrollments)
+            .where(enrollments.c.user_id == batch.c.user_id, enrollments.c.course_id == batch.c.course_id)
+            .values(progress=func.greatest(enrollments.c.progress, batch.c.progress))
+        )
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                flushed = await self.flush()
+                if flushed:
+                    logger.info(f"Flushed {flushed} buffered progress updates")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Progress flush failed: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Final progress flush failed: {e}")
+
+
+progress_buffer = ProgressBuffer(
+    interval=settings.PROGRESS_FLUSH_INTERVAL_SECONDS,
+    batch_size=settings.PROGRESS_FLUSH_BATCH_SIZE
+)
@@ -0,0 +1,114 @@
+# api/v1/services/token_revocation.py
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, Optional
+
+from api.db.redis import get_redis, listen
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+REVOKED_TOKENS_KEY = "revoked_tokens"
+
+
+def token_fingerprint(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevocationCache:
+    """
+    Per-worker copy of the token blacklist.
+
+    Revocations are published on a Redis channel and mirrored into a sorted
+    set (score = token expiry) so a worker can bootstrap on startup. While the
+    subscriber is connected, lookups are answered from memory; if it drops,
+    is_revoked() returns None and callers fall back to Redis.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._revoked: Dict[str, float] = {}
+        self._ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def is_revoked(self, token: str) -> Optional[bool]:
+        if not self._ready:
+            return None
+        exp = self._revoked.get(token_fingerprint(token))
+        return exp is not None and exp > time.time()
+
+    def add(self, fingerprint: str, exp: float):
+        self._revoked[fingerprint] = exp
+
+    async def revoke(self, token: str, exp: float):
+        """Record a revocation in Redis and broadcast it to every worker."""
+        fingerprint = token_fingerprint(token)
+        ttl = int(exp - time.time())
+        self.add(fingerprint, exp)
+        if ttl <= 0:
+            return
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.setex(token, ttl, "blacklisted")
+            pipe.zadd(REVOKED_TOKENS_KEY, {fingerprint: exp})
+            pipe.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", time.time())
+            pipe.publish(self.channel, f"{fingerprint}:{exp}")
+            await pipe.execute()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        self._ready = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        # Subscribe before loading the snapshot so nothing published in between is lost
+        await listen(
+            self.channel,
+            on_message=self._handle,
+            on_subscribed=self._bootstrap,
+            on_disconnect=self._mark_stale,
+            idle=self._prune,
+        )
+
+    def _mark_stale(self):
+        self._ready = False
+
+    async def _bootstrap(self):
+        now = time.time()
+        entries = await get_redis().zrangebyscore(REVOKED_TOKENS_KEY, now, "+inf", withscores=True)
+        self._revoked = {self._decode(fingerprint): exp for fingerprint, exp in entries}
+        self._ready = True
+
+    def _handle(self, data: str):
+        try:
+            fingerprint, exp = data.rsplit(":", 1)
+            self.add(fingerprint, float(exp))
+        except ValueError:
+            logger.warning(f"Ignoring malformed revocation message: {data!r}")
+
+    def _prune(self):
+        now = time.time()
+        expired = [fingerprint for fingerprint, exp in self._revoked.items() if exp <= now]
+        for fingerprint in expired:
+            del self._revoked[fingerprint]
+
+    @staticmethod
+    def _decode(value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+
+revocation_cache = RevocationCache(channel=settings.TOKEN_REVOCATION_CHANNEL)
@@ -0,0 +1,105 @@
+# api/v1/services/user_cache.py
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+from cachetools import TTLCache
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from api.db.redis import get_redis, listen
+from api.v1.models.user import User
+from core.config.settings import settings
+
+
+class AuthenticatedUserCache:
+    """
+    Per-worker TTL+LRU cache of token -> (decoded claims, User column snapshot).
+
+    Snapshots are plain dicts so every request gets its own detached User
+    instance; sharing one ORM object across sessions is not safe. User
+    invalidations are broadcast over Redis pub/sub so every worker drops
+    its copy after a profile change.
+    """
+
+    def __init__(self, channel: str, maxsize: int, ttl: int):
+        self.channel = channel
+        self._task: Optional[asyncio.Task] = None
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._columns = [attr.key for attr in inspect(User).column_attrs]
+
+    def get(self, token: str) -> Optional[Tuple[dict, User]]:
+        with self._lock:
+            entry = self._entries.get(token)
+        if entry is None:
+            return None
+
+        payload, snapshot = entry
+        exp = payload.get("exp")
+        if exp is not None and exp <= time.time():
+            self.invalidate_token(token)
+            return None
+        return payload, self._build_user(snapshot)
+
+    def set(self, token: str, payload: dict, user: User):
+        snapshot = {column: getattr(user, column) for column in self._columns}
+        user_id = str(user.id)
+        with self._lock:
+            self._entries[token] = (payload, snapshot)
+            # Drop tokens the TTL has already evicted so the index stays bounded
+            tokens = {t for t in self._tokens_by_user.get(user_id, set()) if t in self._entries}
+            tokens.add(token)
+            self._tokens_by_user[user_id] = tokens
+
+    def invalidate_token(self, token: str):
+        with self._lock:
+            entry = self._entries.pop(token, None)
+            if entry is not None:
+                tokens = self._tokens_by_user.get(str(entry[1]["id"]))
+                if tokens:
+                    tokens.discard(token)
+
+    def drop_user(self, user_id):
+        with self._lock:
+            for token in self._tokens_by_user.pop(str(user_id), set()):
+                self._entries.pop(token, None)
+
+    async def invalidate_user(self, user_id):
+        """Drop a user's cached entries on every worker."""
+        self.drop_user(user_id)
+        await get_redis().publish(self.channel, str(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def start(self):
+        if self._task is None:
+            # A dropped subscription may have missed invalidations, so start over
+            self._task = asyncio.create_task(
+                listen(self.channel, on_message=self.drop_user, on_disconnect=self.clear)
+            )
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _build_user(self, snapshot: dict) -> User:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return user
+
+
+user_cache = AuthenticatedUserCache(
+    channel=settings.AUTH_USER_CACHE_CHANNEL,
+    maxsize=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,241 @@
+# api/workers/email_worker.py
+"""
+Outbound mail worker.
+
+    python -m api.workers.email_worker
+
+Pulls jobs queued by api.utils.email_queue.enqueue_email, keeps one
+authenticated SMTP session open across batches, and retries failures with
+exponential backoff before parking them on a dead-letter list.
+"""
+import asyncio
+import json
+import logging
+import random
+import socket
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import List, Optional
+
+import aiosmtplib
+from jinja2 import TemplateError
+from redis.exceptions import RedisError
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import Mail
+
+from api.db.redis import get_blocking_redis, get_redis, close_redis
+from api.utils.email_templates import email_templates
+from api.utils.email_queue import QUEUE_KEY, RETRY_KEY, DEAD_KEY, METRICS_KEY, processing_key
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UnrenderableEmailError(Exception):
+    """The job's template can't be rendered; retrying won't change that."""
+
+
+class EmailWorker:
+    def __init__(self, worker_id: str):
+        self.worker_id = worker_id
+        self.processing_key = processing_key(worker_id)
+        self.from_email = settings.MAIL_FROM or settings.EMAILS_FROM_EMAIL or "no-reply@example.com"
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._sendgrid: Optional[SendGridAPIClient] = None
+        self._max_latency = 0.0
+
+    @property
+    def smtp_configured(self) -> bool:
+        return bool(settings.EMAIL_HOST and settings.EMAIL_USERNAME and settings.EMAIL_PASSWORD)
+
+    # --- Transport ---
+    async def _get_smtp(self) -> aiosmtplib.SMTP:
+        if self._smtp is None or not self._smtp.is_connected:
+            self._smtp = aiosmtplib.SMTP(
+                hostname=settings.EMAIL_HOST,
+                port=settings.EMAIL_PORT,
+                use_tls=settings.EMAIL_USE_SSL,
+                timeout=settings.EMAIL_SMTP_TIMEOUT,
+            )
+            await self._smtp.connect()
+            await self._smtp.login(settings.EMAIL_USERNAME, settings.EMAIL_PASSWORD)
+            logger.info("Opened SMTP session")
+        return self._smtp
+
+    async def _close_smtp(self):
+        if self._smtp is not None and self._smtp.is_connected:
+            try:
+                await self._smtp.quit()
+            except aiosmtplib.SMTPException:
+                self._smtp.close()
+        self._smtp = None
+
+    def _render(self, job: dict) -> dict:
+        """Fill subject/content/text_content from the job's template, if it names one."""
+        if job.get("template"):
+            try:
+                rendered = email_templates.render(job["template"], **job.get("context", {}))
+            except (TemplateError, ValueError, TypeError) as e:
+                raise UnrenderableEmailError(f"Cannot render template {job['template']!r}: {e}") from e
+            return {**job, "subject": rendered.subject, "content": rendered.html, "text_content": rendered.text}
+        return job
+
+    def _build_message(self, job: dict) -> MIMEMultipart:
+        message = MIMEMultipart("alternative")
+        message["Subject"] = job["subject"]
+        message["From"] = self.from_email
+        message["To"] = job["to_email"]
+        if job.get("text_content"):
+            message.attach(MIMEText(job["text_content"], "plain"))
+        message.attach(MIMEText(job["content"], "html"))
+        return message
+
+    async def _send_smtp(self, job: dict):
+        message = self._build_message(job)
+        try:
+            smtp = await self._get_smtp()
+            await smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # Server dropped an idle session; reconnect once and resend
+            self._smtp = None
+            smtp = await self._get_smtp()
+            await smtp.send_message(message)
+
+    async def _send_sendgrid(self, job: dict):
+        if self._sendgrid is None:
+            self._sendgrid = SendGridAPIClient(settings.SENDGRID_API_KEY)
+        message = Mail(
+            from_email=self.from_email,
+            to_emails=job["to_email"],
+            subject=job["subject"],
+            html_content=job["content"],
+            plain_text_content=job.get("text_content"),
+        )
+        response = await asyncio.to_thread(self._sendgrid.send, message)
+        if not 200 <= response.status_code < 300:
+            raise RuntimeError(f"SendGrid failed: {response.status_code} - {response.body}")
+
+    async def send(self, job: dict):
+        """Send via SMTP (preferred), falling back to SendGrid."""
+        job = self._render(job)
+        if self.smtp_configured:
+            try:
+                await self._send_smtp(job)
+                return
+            except Exception as e:
+                if not settings.SENDGRID_API_KEY:
+                    raise
+                logger.warning(f"SMTP email failed, falling back to SendGrid: {e}")
+                await self._close_smtp()
+
+        if settings.SENDGRID_API_KEY:
+            await self._send_sendgrid(job)
+        else:
+            token = job.get("context", {}).get("token")
+            if token:
+                logger.warning(f"Email not sent. Token for {job['to_email']}: {token}")
+            else:
+                logger.warning(f"Email not configured; dropping '{job['subject']}' to {job['to_email']}")
+
+    # --- Queue handling ---
+    async def recover(self):
+        """Requeue jobs this worker had claimed when it last stopped."""
+        redis = get_redis()
+        while await redis.lmove(self.processing_key, QUEUE_KEY, "RIGHT", "RIGHT"):
+            pass
+
+    async def promote_due_retries(self):
+        redis = get_redis()
+        due = await redis.zrangebyscore(RETRY_KEY, "-inf", time.time(), start=0, num=100)
+        for raw in due:
+            # Only the worker that wins the ZREM requeues the job
+            if await redis.zrem(RETRY_KEY, raw):
+                await redis.lpush(QUEUE_KEY, raw)
+
+    async def claim_batch(self) -> List[str]:
+        redis = get_redis()
+        first = await get_blocking_redis().blmove(QUEUE_KEY, self.processing_key, settings.EMAIL_WORKER_POLL_SECONDS, "RIGHT", "LEFT")
+        if first is None:
+            return []
+        batch = [first]
+        while len(batch) < settings.EMAIL_BATCH_SIZE:
+            raw = await redis.lmove(QUEUE_KEY, self.processing_key, "RIGHT", "LEFT")
+            if raw is None:
+                break
+            batch.append(raw)
+        return batch
+
+    async def process_batch(self, batch: List[str]):
+        redis = get_redis()
+        for raw in batch:
+            job = json.loads(raw)
+            try:
+                await self.send(job)
+            except UnrenderableEmailError as e:
+                await self._handle_failure(job, e, retryable=False)
+            except Exception as e:
+                await self._handle_failure(job, e)
+            else:
+                await self._record_sent(job)
+            await redis.lrem(self.processing_key, 1, raw)
+        await redis.hincrby(METRICS_KEY, "batches", 1)
+
+    async def _record_sent(self, job: dict):
+        latency = time.time() - job["enqueued_at"]
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.hincrby(METRICS_KEY, "sent", 1)
+            pipe.hincrbyfloat(METRICS_KEY, "latency_seconds_total", latency)
+            if latency > self._max_latency:
+                self._max_latency = latency
+                pipe.hset(METRICS_KEY, "latency_seconds_max", latency)
+            await pipe.execute()
+
+    async def _handle_failure(self, job: dict, error: Exception, retryable: bool = True):
+        redis = get_redis()
+        job["attempts"] += 1
+        await redis.hincrby(METRICS_KEY, "failed_attempts", 1)
+        if not retryable or job["attempts"] >= settings.EMAIL_MAX_ATTEMPTS:
+            logger.error(f"Giving up on email {job['id']} to {job['to_email']} after {job['attempts']} attempts: {error}")
+            await redis.lpush(DEAD_KEY, json.dumps(job))
+            return
+
+        delay = settings.EMAIL_RETRY_BASE_SECONDS * (2 ** (job["attempts"] - 1))
+        delay = min(delay, settings.EMAIL_RETRY_MAX_SECONDS) * random.uniform(0.5, 1.0)
+        logger.warning(f"Email {job['id']} failed (attempt {job['attempts']}), retrying in {delay:.1f}s: {error}")
+        await redis.zadd(RETRY_KEY, {json.dumps(job): time.time() + delay})
+
+    async def run(self):
+        email_templates.load()
+        recover = True
+        logger.info(f"Email worker {self.worker_id} started")
+        try:
+            while True:
+                try:
+                    if recover:
+                        await self.recover()
+                        recover = False
+                    await self.promote_due_retries()
+                    batch = await self.claim_batch()
+                    if batch:
+                        await self.process_batch(batch)
+                except RedisError as e:
+                    # Jobs claimed before the error are still on the processing list
+                    logger.error(f"Redis error in email worker {self.worker_id}: {e}")
+                    recover = True
+                    await asyncio.sleep(settings.EMAIL_WORKER_POLL_SECONDS)
+        finally:
+            await self._close_smtp()
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    worker = EmailWorker(settings.EMAIL_WORKER_ID or socket.gethostname())
+    try:
+        await worker.run()
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,196 @@
+# api/workers/paypal_webhook_worker.py
+"""
+PayPal webhook consumer.
+
+    python -m api.workers.paypal_webhook_worker
+
+Reads verified events queued by api.v1.services.paypal_webhooks.ingest_webhook
+from a Redis stream consumer group, skips event ids it has already applied,
+and updates Payment.status for a whole batch in one statement. Entries are
+acknowledged only after the update commits; anything left pending by a
+crashed consumer is reclaimed after PAYPAL_WEBHOOK_CLAIM_IDLE_SECONDS.
+"""
+import asyncio
+import json
+import logging
+import socket
+from typing import Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy import Integer, String, case, column, func, update, values
+
+from api.db.redis import get_blocking_redis, get_redis, close_redis
+from api.db.session import async_session
+from api.v1.models.payment import Payment
+from api.v1.services.paypal_webhooks import GROUP, METRICS_KEY, STREAM_KEY, seen_key
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Event type -> Payment.status it moves the order to
+EVENT_STATUSES = {
+    "CHECKOUT.ORDER.APPROVED": "approved",
+    "CHECKOUT.ORDER.COMPLETED": "completed",
+    "CHECKOUT.ORDER.VOIDED": "cancelled",
+    "PAYMENT.CAPTURE.COMPLETED": "completed",
+    "PAYMENT.CAPTURE.DENIED": "failed",
+    "PAYMENT.CAPTURE.DECLINED": "failed",
+    "PAYMENT.CAPTURE.REFUNDED": "refunded",
+}
+
+# Deliveries can arrive out of order; a status only ever moves forward
+STATUS_RANK = {
+    "pending": 0, "approved": 1, "capturing": 2,
+    "completed": 3, "failed": 3, "cancelled": 3, "refunded": 4,
+}
+
+
+def parse_event(event: dict) -> Optional[Tuple[str, str, Optional[str]]]:
+    """Return (order id, status, capture id) for events that change a payment."""
+    status = EVENT_STATUSES.get(event.get("event_type"))
+    resource = event.get("resource") or {}
+    if status is None:
+        return None
+    if event["event_type"].startswith("CHECKOUT.ORDER."):
+        return resource.get("id"), status, None
+    order_id = resource.get("supplementary_data", {}).get("related_ids", {}).get("order_id")
+    return order_id, status, resource.get("id")
+
+
+class PayPalWebhookWorker:
+    def __init__(self, consumer: str):
+        self.consumer = consumer
+
+    async def ensure_group(self):
+        try:
+            await get_redis().xgroup_create(STREAM_KEY, GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def claim_batch(self) -> List[Tuple[str, Dict[str, str]]]:
+        redis = get_redis()
+        # Entries another consumer read but never acknowledged
+        _, claimed, *_ = await redis.xautoclaim(
+            STREAM_KEY, GROUP, self.consumer,
+            min_idle_time=settings.PAYPAL_WEBHOOK_CLAIM_IDLE_SECONDS * 1000,
+            count=settings.PAYPAL_WEBHOOK_BATCH_SIZE,
+        )
+        if claimed:
+            return claimed
+        response = await get_blocking_redis().xreadgroup(
+            GROUP, self.consumer, {STREAM_KEY: ">"},
+            count=settings.PAYPAL_WEBHOOK_BATCH_SIZE,
+            block=int(settings.PAYPAL_WEBHOOK_BLOCK_SECONDS * 1000),
+        )
+        return response[0][1] if response else []
+
+    async def recover(self) -> List[Tuple[str, Dict[str, str]]]:
+        """Entries this consumer had read but not acknowledged when it last stopped."""
+        response = await get_redis().xreadgroup(
+            GROUP, self.consumer, {STREAM_KEY: "0"}, count=settings.PAYPAL_WEBHOOK_BATCH_SIZE
+        )
+        return response[0][1] if response else []
+
+    async def process_batch(self, entries: List[Tuple[str, Dict[str, str]]]):
+        redis = get_redis()
+        entry_ids = [entry_id for entry_id, _ in entries]
+        event_ids = [(fields or {}).get("event_id", "") for _, fields in entries]
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for event_id in event_ids:
+                pipe.exists(seen_key(event_id))
+            seen = await pipe.execute()
+
+        # Latest-wins per order within the batch, by status rank
+        updates: Dict[str, Tuple[str, Optional[str]]] = {}
+        fresh, duplicates, ignored = set(), 0, 0
+        for (entry_id, fields), event_id, already_seen in zip(entries, event_ids, seen):
+            if already_seen or event_id in fresh:
+                duplicates += 1
+                continue
+            try:
+                parsed = parse_event(json.loads(fields["body"]))
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Dropping malformed webhook entry {entry_id}")
+                parsed = None
+            fresh.add(event_id)
+            if parsed is None or not parsed[0]:
+                ignored += 1
+                continue
+            order_id, status, capture_id = parsed
+            current = updates.get(order_id)
+            if current is None or STATUS_RANK[status] > STATUS_RANK[current[0]]:
+                updates[order_id] = (status, capture_id or (current[1] if current else None))
+
+        if updates:
+            async with async_session() as db:
+                await self._write(db, updates)
+                await db.commit()
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for event_id in fresh:
+                pipe.set(seen_key(event_id), "1", ex=settings.PAYPAL_WEBHOOK_DEDUP_TTL_SECONDS)
+            pipe.xack(STREAM_KEY, GROUP, *entry_ids)
+            pipe.hincrby(METRICS_KEY, "processed", len(fresh) - ignored)
+            pipe.hincrby(METRICS_KEY, "duplicates", duplicates)
+            pipe.hincrby(METRICS_KEY, "ignored", ignored)
+            pipe.hincrby(METRICS_KEY, "batches", 1)
+            await pipe.execute()
+
+    @staticmethod
+    async def _write(db, updates: Dict[str, Tuple[str, Optional[str]]]):
+        batch = values(
+            column("order_id", String),
+            column("status", String),
+            column("rank", Integer),
+            column("capture_id", String),
+            name="batch",
+        ).data([
+            (order_id, status, STATUS_RANK[status], capture_id)
+            for order_id, (status, capture_id) in updates.items()
+        ])
+        payments = Payment.__table__
+        current_rank = case(STATUS_RANK, value=payments.c.status, else_=0)
+        await db.execute(
+            update(payments)
+            .where(payments.c.paypal_order_id == batch.c.order_id, batch.c.rank > current_rank)
+            .values(
+                status=batch.c.status,
+                paypal_payment_id=func.coalesce(batch.c.capture_id, payments.c.paypal_payment_id),
+            )
+        )
+
+    async def run(self):
+        logger.info(f"PayPal webhook consumer {self.consumer} started")
+        entries, recover = [], True
+        while True:
+            try:
+                if recover:
+                    await self.ensure_group()
+                    entries, recover = await self.recover(), False
+                if entries:
+                    await self.process_batch(entries)
+                entries = await self.claim_batch()
+            except RedisError as e:
+                # Entries read before the error are still pending on this consumer
+                logger.error(f"Redis error in PayPal webhook consumer {self.consumer}: {e}")
+                entries, recover = [], True
+                await asyncio.sleep(settings.PAYPAL_WEBHOOK_BLOCK_SECONDS)
+            except Exception as e:
+                # Left unacknowledged; xautoclaim hands them back once idle
+                logger.error(f"Failed to apply {len(entries)} webhook events: {e}")
+                entries = []
+                await asyncio.sleep(settings.PAYPAL_WEBHOOK_BLOCK_SECONDS)
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    worker = PayPalWebhookWorker(settings.PAYPAL_WEBHOOK_CONSUMER or socket.gethostname())
+    try:
+        await worker.run()
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Checkout load test: create order -> buyer approval -> capture, with N
+concurrent buyers, against the local PayPal stand-in (benchmarks/fake_paypal.py).
+
+service: drives PayPalService directly, isolating the PayPal client path
+api:     drives POST /payments/create-order and /payments/capture/{id} on a
+         running API whose PAYPAL_BASE_URL points at the fake, sampling
+         GET /metrics/db to report peak checked-out DB connections
+
+    uvicorn benchmarks.fake_paypal:app --port 8900
+    PAYPAL_BASE_URL=http://127.0.0.1:8900 python -m benchmarks.checkout_load service --buyers 50 --checkouts 1000
+    python -m benchmarks.checkout_load api --email buyer@example.com --password ... --course-id 1
+
+--latency-ms / --error-rate reconfigure the fake before the run. With the
+payment routes releasing their session around PayPal calls, peak pool usage
+should stay well below --buyers even at --latency-ms 2000.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+import httpx
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_buyers(checkout: Callable[[], Awaitable[None]], buyers: int, checkouts: int):
+    latencies: List[float] = []
+    failures = 0
+    remaining = iter(range(checkouts))
+
+    async def buyer():
+        nonlocal failures
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                await checkout()
+            except Exception:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(buyer() for _ in range(buyers)))
+    elapsed = time.perf_counter() - started
+
+    print(f"{checkouts} checkouts, {buyers} concurrent buyers, {elapsed:.2f}s")
+    print(f"  throughput  {len(latencies) / elapsed:8.1f} checkouts/s")
+    print(f"  failures    {failures:8d}")
+    if latencies:
+        print(f"  p50         {percentile(latencies, 50) * 1000:8.1f} ms")
+        print(f"  p99         {percentile(latencies, 99) * 1000:8.1f} ms")
+        print(f"  mean        {statistics.mean(latencies) * 1000:8.1f} ms")
+
+
+def approval_url(links) -> str:
+    return next(link["href"] for link in links if link.get("rel") == "approve")
+
+
+async def service_checkouts(args, client: httpx.AsyncClient):
+    from api.v1.services.payment import close_http_client, get_paypal_service
+
+    paypal_service = get_paypal_service()
+    if args.paypal_url:
+        paypal_service.base_url = args.paypal_url
+
+    async def checkout():
+        order = await paypal_service.create_order(amount=3500.0, course_id="1", user_id="load-test")
+        await client.get(approval_url(order["links"]))
+        await paypal_service.capture_order(order["id"])
+
+    try:
+        await run_buyers(checkout, args.buyers, args.checkouts)
+    finally:
+        await close_http_client()
+
+
+async def api_checkouts(args, client: httpx.AsyncClient):
+    api = f"{args.api_url}/api/v1"
+    response = await client.post(f"{api}/auth/login", json={"email": args.email, "password": args.password})
+    response.raise_for_status()
+    auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def checkout():
+        response = await client.post(
+            f"{api}/payments/create-order",
+            json={"course_id": args.course_id, "amount": 3500.0},
+            headers=auth,
+        )
+        response.raise_for_status()
+        order = response.json()
+        await client.get(order["approval_url"])
+        response = await client.post(f"{api}/payments/capture/{order['order_id']}", headers=auth)
+        response.raise_for_status()
+
+    peak = {"checked_out": 0, "overflow": 0}
+    metrics_auth = {"Authorization": f"Bearer {args.metrics_token}"}
+
+    async def sample_pool():
+        while True:
+            stats = (await client.get(f"{api}/metrics/db", headers=metrics_auth)).json()
+            for key in peak:
+                peak[key] = max(peak[key], stats[key])
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample_pool())
+    try:
+        await run_buyers(checkout, args.buyers, args.checkouts)
+    finally:
+        sampler.cancel()
+    stats = (await client.get(f"{api}/metrics/db", headers=metrics_auth)).json()
+    print(f"  db pool     peak {peak['checked_out']} checked out, peak overflow {peak['overflow']}, "
+          f"pool_size {stats['pool_size']}, checkout timeouts {stats.get('checkout_timeouts', 0)}")
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.buyers * 2)
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+        if args.latency_ms is not None or args.error_rate is not None:
+            fake_config = (await client.get(f"{args.paypal_url}/_config")).json()
+            fake_config.pop("stats", None)
+            fake_config.pop("orders", None)
+            if args.latency_ms is not None:
+                fake_config["latency_ms"] = args.latency_ms
+            if args.error_rate is not None:
+                fake_config["error_rate"] = args.error_rate
+            await client.put(f"{args.paypal_url}/_config", json=fake_config)
+        if args.mode == "service":
+            await service_checkouts(args, client)
+        else:
+            await api_checkouts(args, client)
+        print(f"  fake PayPal {(await client.get(f'{args.paypal_url}/_config')).json()['stats']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["service", "api"])
+    parser.add_argument("--buyers", type=int, default=20)
+    parser.add_argument("--checkouts", type=int, default=500)
+    parser.add_argument("--paypal-url", default="http://127.0.0.1:8900")
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--api-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument("--course-id", type=int, default=1)
+    parser.add_argument("--metrics-token", help="the API's METRICS_TOKEN, for sampling /metrics/db")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Per-course serialization cost for the course endpoints.
+
+before: FastAPI's default path for raw ORM objects (jsonable_encoder + json.dumps)
+after:  precompiled pydantic TypeAdapter dumping straight to JSON bytes
+
+    python -m benchmarks.course_serialization [courses] [rounds]
+"""
+import json
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from api.v1.models import Course
+from api.v1.schemas.course import serialize_courses
+
+
+def make_courses(count: int):
+    curriculum = [
+        {"day": f"Week {week}", "topics": [f"Topic {week}.{i}" for i in range(6)]}
+        for week in range(1, 13)
+    ]
+    bullets = [f"Objective {i}: " + "lorem ipsum " * 8 for i in range(8)]
+    return [
+        Course(
+            id=i,
+            name=f"Course {i}",
+            category="AI",
+            duration="3 Months",
+            summary="A practical course. " * 5,
+            description="Long description. " * 60,
+            image=f"./assets/images/course-{i}.jpg",
+            price=3500.0,
+            courseobjectives=bullets,
+            curriculum=curriculum,
+            targetaudience=bullets,
+            coursebenefits=bullets,
+            coursecompletion=bullets[:2],
+        )
+        for i in range(count)
+    ]
+
+
+def bench(label: str, func, courses, rounds: int) -> float:
+    func(courses)  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(courses)
+    elapsed = time.perf_counter() - start
+    per_course_us = elapsed / (rounds * len(courses)) * 1e6
+    print(f"{label:<8} {per_course_us:8.2f} us/course  ({elapsed:.3f}s total)")
+    return per_course_us
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    courses = make_courses(count)
+
+    print(f"Serializing {count} courses x {rounds} rounds")
+    before = bench("before", lambda rows: json.dumps(jsonable_encoder(rows)).encode(), courses, rounds)
+    after = bench("after", serialize_courses, courses, rounds)
+    print(f"speedup  {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Render throughput of the email templates for bulk sends.
+
+precompiled: EmailTemplates.render() with templates compiled once at load
+reparsed:    parsing the template source on every send (what per-request
+             f-string/ad hoc rendering amounts to once templates live in files)
+
+    python -m benchmarks.email_templates [emails]
+"""
+import sys
+import time
+
+from api.utils.email_templates import EMAIL_SUBJECTS, EmailTemplates
+
+
+def bench(label: str, render, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        render(i)
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed
+    print(f"{label:<12} {rate:12,.0f} emails/s  ({elapsed * 1e6 / count:7.2f} us/email)")
+    return rate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    templates = EmailTemplates()
+    templates.load()
+    source = {
+        name: {part: templates.env.loader.get_source(templates.env, f"{name}.{part}")[0] for part in ("html", "txt")}
+        for name in EMAIL_SUBJECTS
+    }
+    names = list(EMAIL_SUBJECTS)
+
+    def precompiled(i):
+        templates.render(names[i % len(names)], token=str(10000 + i), expires_minutes=10)
+
+    def reparsed(i):
+        parts = source[names[i % len(names)]]
+        for text in parts.values():
+            templates.env.from_string(text).render(token=str(10000 + i), expires_minutes=10)
+
+    print(f"Rendering {count} emails (HTML + plaintext parts)")
+    fast = bench("precompiled", precompiled, count)
+    slow = bench("reparsed", reparsed, max(count // 20, 1))
+    print(f"speedup      {fast / slow:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Local PayPal stand-in.
+
+Implements the slice of PayPal the API talks to -- OAuth tokens, orders
+(create/get/capture) and webhook signing certs -- with configurable latency
+and error injection, so checkout and the webhook consumer can be driven and
+load-tested without the sandbox:
+
+    uvicorn benchmarks.fake_paypal:app --port 8900
+
+    # in the API's environment
+    PAYPAL_BASE_URL=http://127.0.0.1:8900
+    PAYPAL_WEBHOOK_ID=WH-LOCAL
+    PAYPAL_CERT_URL_PREFIXES='["http://127.0.0.1:8900/"]'
+
+    python -m benchmarks.fake_paypal deliver --order ORDER-1 --duplicates 2
+
+Latency and faults are read from FAKE_PAYPAL_LATENCY_MS, FAKE_PAYPAL_JITTER_MS,
+FAKE_PAYPAL_ERROR_RATE and FAKE_PAYPAL_TIMEOUT_RATE at startup and can be
+changed on a running server with PUT /_config.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.x509.oid import NameOID
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+CERT_NAME = "CERT-LOCAL-0001"
+TOKEN_TTL_SECONDS = 32400
+
+
+def _make_signing_cert() -> Tuple[rsa.RSAPrivateKey, bytes]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "messageverificationcerts.local")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(minutes=5))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    return key, cert.public_bytes(serialization.Encoding.PEM)
+
+
+# Generated per process: uvicorn and the deliver command each get their own
+# key, so deliver fetches the one behind the served cert via /_signing-key.
+signing_key, signing_cert_pem = _make_signing_cert()
+
+
+class FaultConfig(BaseModel):
+    latency_ms: float = float(os.getenv("FAKE_PAYPAL_LATENCY_MS", "0"))
+    jitter_ms: float = float(os.getenv("FAKE_PAYPAL_JITTER_MS", "0"))
+    error_rate: float = float(os.getenv("FAKE_PAYPAL_ERROR_RATE", "0"))  # share of calls answered with a 503
+    timeout_rate: float = float(os.getenv("FAKE_PAYPAL_TIMEOUT_RATE", "0"))  # share of calls that hang for 60s
+
+
+config = FaultConfig()
+tokens: Dict[str, float] = {}
+orders: Dict[str, Dict] = {}
+# PayPal-Request-Id -> response body, so retried POSTs replay instead of repeating
+idempotent_responses: Dict[str, Dict] = {}
+stats: Dict[str, int] = {"requests": 0, "injected_errors": 0, "injected_timeouts": 0, "replays": 0}
+
+app = FastAPI(title="Fake PayPal")
+
+
+@app.middleware("http")
+async def inject_faults(request: Request, call_next):
+    if request.url.path.startswith("/_"):
+        return await call_next(request)
+    stats["requests"] += 1
+    delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+    if delay:
+        await asyncio.sleep(delay / 1000)
+    roll = random.random()
+    if roll < config.timeout_rate:
+        stats["injected_timeouts"] += 1
+        await asyncio.sleep(60)
+    elif roll < config.timeout_rate + config.error_rate:
+        stats["injected_errors"] += 1
+        return JSONResponse({"name": "SERVICE_UNAVAILABLE", "message": "Injected fault"}, status_code=503)
+    return await call_next(request)
+
+
+def _require_token(authorization: Optional[str]):
+    token = (authorization or "").removeprefix("Bearer ")
+    expires_at = tokens.get(token)
+    if expires_at is None or expires_at < time.monotonic():
+        raise HTTPException(status_code=401, detail={"error": "invalid_token"})
+
+
+def _order_links(order_id: str, base_url: str):
+    return [
+        {"href": f"{base_url}v2/checkout/orders/{order_id}", "rel": "self", "method": "GET"},
+        {"href": f"{base_url}checkoutnow?token={order_id}", "rel": "approve", "method": "GET"},
+        {"href": f"{base_url}v2/checkout/orders/{order_id}/capture", "rel": "capture", "method": "POST"},
+    ]
+
+
+@app.post("/v1/oauth2/token")
+async def issue_token():
+    token = f"A21AA{uuid.uuid4().hex}"
+    tokens[token] = time.monotonic() + TOKEN_TTL_SECONDS
+    return {"access_token": token, "token_type": "Bearer", "expires_in": TOKEN_TTL_SECONDS}
+
+
+@app.post("/v2/checkout/orders", status_code=201)
+async def create_order(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    paypal_request_id: Optional[str] = Header(None),
+):
+    _require_token(authorization)
+    if paypal_request_id in idempotent_responses:
+        stats["replays"] += 1
+        return idempotent_responses[paypal_request_id]
+    payload = await request.json()
+    order_id = uuid.uuid4().hex[:17].upper()
+    order = {
+        "id": order_id,
+        "intent": payload.get("intent", "CAPTURE"),
+        "status": "CREATED",
+        "purchase_units": payload.get("purchase_units", []),
+        "create_time": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "links": _order_links(order_id, str(request.base_url)),
+    }
+    orders[order_id] = order
+    if paypal_request_id:
+        idempotent_responses[paypal_request_id] = order
+    return order
+
+
+@app.get("/v2/checkout/orders/{order_id}")
+async def get_order(order_id: str, authorization: Optional[str] = Header(None)):
+    _require_token(authorization)
+    if order_id not in orders:
+        raise HTTPException(status_code=404, detail={"name": "RESOURCE_NOT_FOUND"})
+    return orders[order_id]
+
+
+@app.get("/checkoutnow")
+async def approve_order(token: str):
+    """Stands in for the buyer approving the order on PayPal's checkout page."""
+    order = orders.get(token)
+    if order is None:
+        raise HTTPException(status_code=404, detail={"name": "RESOURCE_NOT_FOUND"})
+    if order["status"] == "CREATED":
+        order["status"] = "APPROVED"
+    return {"id": token, "status": order["status"]}
+
+
+@app.post("/v2/checkout/orders/{order_id}/capture", status_code=201)
+async def capture_order(
+    order_id: str,
+    authorization: Optional[str] = Header(None),
+    paypal_request_id: Optional[str] = Header(None),
+):
+    _require_token(authorization)
+    if paypal_request_id in idempotent_responses:
+        stats["replays"] += 1
+        return idempotent_responses[paypal_request_id]
+    order = orders.get(order_id)
+    if order is None:
+        raise HTTPException(status_code=404, detail={"name": "RESOURCE_NOT_FOUND"})
+    if order["status"] == "CREATED":
+        raise HTTPException(status_code=422, detail={"name": "UNPROCESSABLE_ENTITY", "details": [{"issue": "ORDER_NOT_APPROVED"}]})
+    if order["status"] == "COMPLETED":
+        raise HTTPException(status_code=422, detail={"name": "UNPROCESSABLE_ENTITY", "details": [{"issue": "ORDER_ALREADY_CAPTURED"}]})
+    order["status"] = "COMPLETED"
+    for unit in order["purchase_units"]:
+        unit["payments"] = {"captures": [{
+            "id": uuid.uuid4().hex[:17].upper(),
+            "status": "COMPLETED",
+            "amount": unit.get("amount"),
+        }]}
+    if paypal_request_id:
+        idempotent_responses[paypal_request_id] = order
+    return order
+
+
+@app.get(f"/v1/notifications/certs/{CERT_NAME}")
+async def get_cert():
+    return Response(signing_cert_pem, media_type="application/x-pem-file")
+
+
+@app.get("/_signing-key")
+async def get_signing_key():
+    pem = signing_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    return Response(pem, media_type="application/x-pem-file")
+
+
+@app.get("/_config")
+async def get_config():
+    return {**config.model_dump(), "stats": stats, "orders": len(orders)}
+
+
+@app.put("/_config")
+async def set_config(new_config: FaultConfig):
+    global config
+    config = new_config
+    return config
+
+
+def sign_webhook(event: Dict, webhook_id: str, cert_url: str, key: rsa.RSAPrivateKey = None) -> Tuple[Dict, bytes]:
+    """Return (headers, body) for a delivery signed like PayPal's."""
+    body = json.dumps(event).encode()
+    transmission_id = str(uuid.uuid4())
+    transmission_time = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    message = f"{transmission_id}|{transmission_time}|{webhook_id}|{zlib.crc32(body)}".encode()
+    signature = (key or signing_key).sign(message, padding.PKCS1v15(), hashes.SHA256())
+    headers = {
+        "Content-Type": "application/json",
+        "PAYPAL-TRANSMISSION-ID": transmission_id,
+        "PAYPAL-TRANSMISSION-TIME": transmission_time,
+        "PAYPAL-TRANSMISSION-SIG": base64.b64encode(signature).decode(),
+        "PAYPAL-CERT-URL": cert_url,
+        "PAYPAL-AUTH-ALGO": "SHA256withRSA",
+    }
+    return headers, body
+
+
+def capture_completed_event(order_id: str) -> Dict:
+    return {
+        "id": f"WH-{uuid.uuid4().hex[:20].upper()}",
+        "event_type": "PAYMENT.CAPTURE.COMPLETED",
+        "resource_type": "capture",
+        "resource": {
+            "id": uuid.uuid4().hex[:17].upper(),
+            "status": "COMPLETED",
+            "supplementary_data": {"related_ids": {"order_id": order_id}},
+        },
+    }
+
+
+async def deliver(args):
+    cert_url = f"{args.paypal_url}/v1/notifications/certs/{CERT_NAME}"
+    async with httpx.AsyncClient() as client:
+        key_pem = (await client.get(f"{args.paypal_url}/_signing-key")).content
+        key = serialization.load_pem_private_key(key_pem, password=None)
+        event = capture_completed_event(args.order)
+        # PayPal redelivers until it sees a 2xx; duplicates must be harmless
+        for attempt in range(1 + args.duplicates):
+            headers, body = sign_webhook(event, args.webhook_id, cert_url, key)
+            response = await client.post(f"{args.api_url}/api/v1/payments/webhook", headers=headers, content=body)
+            print(f"delivery {attempt + 1}: {response.status_code} {response.text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    send = sub.add_parser("deliver", help="POST a signed PAYMENT.CAPTURE.COMPLETED event to the API")
+    send.add_argument("--order", required=True, help="PayPal order id of an existing Payment")
+    send.add_argument("--duplicates", type=int, default=0, help="extra redeliveries of the same event")
+    send.add_argument("--webhook-id", default="WH-LOCAL")
+    send.add_argument("--paypal-url", default="http://127.0.0.1:8900")
+    send.add_argument("--api-url", default="http://127.0.0.1:8000")
+    asyncio.run(deliver(parser.parse_args()))
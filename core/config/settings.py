@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import AnyHttpUrl, field_validator
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 class Settings(BaseSettings):
     ENVIRONMENT: str = "production"
@@ -16,10 +16,56 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_PORT: str = "5432"
 
+    # Engine / connection pool tuning
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements; set 0 behind pgbouncer
+
+    # /metrics/* require "Authorization: Bearer <METRICS_TOKEN>"; unset disables them
+    METRICS_TOKEN: Optional[str] = None
+
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Password hashing pool (bcrypt runs off the event loop)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Per-worker cache of authenticated users keyed by access token
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    AUTH_USER_CACHE_CHANNEL: str = "user_invalidations"
+
+    # Token revocations are broadcast so each worker can answer blacklist checks locally
+    TOKEN_REVOCATION_CHANNEL: str = "token_revocations"
+
+    # Serialized course catalog responses, invalidated over Redis pub/sub
+    CATALOG_CACHE_SIZE: int = 512
+    CATALOG_CACHE_TTL_SECONDS: int = 300
+    CATALOG_CACHE_CHANNEL: str = "catalog_invalidations"
+    COURSE_PAGE_SIZE_DEFAULT: int = 50
+    COURSE_PAGE_SIZE_MAX: int = 100
+
+    # Learner progress is buffered in Redis and flushed in batches
+    PROGRESS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    PROGRESS_FLUSH_BATCH_SIZE: int = 500
+
+    # How long a response is replayed for a repeated Idempotency-Key
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+
+    # Uploaded media (api/v1/services/media_storage.py)
+    MEDIA_ROOT: str = "uploads"
+    MEDIA_URL: str = "/media"  # where main.py mounts MEDIA_ROOT; stored picture URLs start with it
+    MEDIA_STAGING_DIR: Optional[str] = None  # outside MEDIA_ROOT, same filesystem; defaults to a sibling of it
+    MEDIA_MAX_PROFILE_PICTURE_BYTES: int = 5 * 1024 * 1024
+    MEDIA_THUMBNAIL_SIZES: List[int] = [128, 256]
+    MEDIA_THUMBNAIL_WORKERS: int = 2
+
     BACKEND_CORS_ORIGINS: List[str] = ["http://127.0.0.1:5500", "https://konasalti.com"]  # Updated
 
     EMAIL_HOST: Optional[str] = None
@@ -36,12 +82,31 @@ class Settings(BaseSettings):
 
     VERIFICATION_BASE_URL: Optional[str] = None
 
+    # Signup MX checks (api/utils/email_utils.py)
+    EMAIL_CHECK_MX: bool = True
+    EMAIL_MX_LOOKUP_TIMEOUT: float = 3.0
+    EMAIL_MX_MIN_TTL: int = 60
+    EMAIL_MX_MAX_TTL: int = 86400
+    EMAIL_MX_NEGATIVE_TTL: int = 300
+
+    # Outbound mail worker (api/workers/email_worker.py)
+    EMAIL_WORKER_ID: Optional[str] = None  # defaults to the hostname
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_WORKER_POLL_SECONDS: float = 5.0
+    EMAIL_SMTP_TIMEOUT: float = 30.0
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: float = 10.0
+    EMAIL_RETRY_MAX_SECONDS: float = 600.0
+
     REDIS_HOST: str 
     REDIS_PORT: int
     REDIS_DB: int
     REDIS_PASSWORD: str = ""
     REDIS_RESPONSE: bool = True
     REDIS_URL: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_SOCKET_TIMEOUT: float = 5.0
 
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
@@ -51,6 +116,43 @@ class Settings(BaseSettings):
     PAYPAL_CLIENT_ID: str
     PAYPAL_CLIENT_SECRET: str
     PAYPAL_WEBHOOK_ID: Optional[str] = None
+    PAYPAL_BASE_URL: str = "https://api-m.sandbox.paypal.com"  # https://api-m.paypal.com in production
+    PAYPAL_HTTP2: bool = True
+    PAYPAL_MAX_CONNECTIONS: int = 20
+    PAYPAL_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    PAYPAL_KEEPALIVE_EXPIRY: float = 60.0
+    PAYPAL_TOKEN_REFRESH_MARGIN: int = 300  # seconds before expiry to refresh the OAuth token
+
+    # Total seconds each PayPal operation may take, retries included
+    PAYPAL_LATENCY_BUDGETS: Dict[str, float] = {
+        "get_access_token": 5.0,
+        "create_order": 10.0,
+        "capture_order": 15.0,
+        "get_order": 5.0,
+    }
+    PAYPAL_CONNECT_TIMEOUT: float = 3.0
+    PAYPAL_MAX_RETRIES: int = 2
+    PAYPAL_RETRY_BASE_SECONDS: float = 0.2
+    PAYPAL_RETRY_MAX_SECONDS: float = 2.0
+    PAYPAL_BREAKER_FAILURE_THRESHOLD: int = 5
+    PAYPAL_BREAKER_RESET_SECONDS: float = 30.0
+    PAYPAL_BREAKER_HALF_OPEN_MAX_CALLS: int = 1
+
+    # Webhooks are verified locally against PayPal's signing certs and queued on a Redis stream
+    PAYPAL_CERT_URL_PREFIXES: List[str] = [
+        "https://api.paypal.com/",
+        "https://api-m.paypal.com/",
+        "https://api.sandbox.paypal.com/",
+        "https://api-m.sandbox.paypal.com/",
+    ]
+    PAYPAL_CERT_CACHE_TTL_SECONDS: int = 86400
+    PAYPAL_WEBHOOK_TOLERANCE_SECONDS: int = 300  # max clock skew on PAYPAL-TRANSMISSION-TIME
+    PAYPAL_WEBHOOK_STREAM_MAXLEN: int = 100000
+    PAYPAL_WEBHOOK_BATCH_SIZE: int = 100
+    PAYPAL_WEBHOOK_BLOCK_SECONDS: float = 5.0
+    PAYPAL_WEBHOOK_CLAIM_IDLE_SECONDS: int = 60  # reclaim events left pending by a dead consumer
+    PAYPAL_WEBHOOK_DEDUP_TTL_SECONDS: int = 7 * 86400
+    PAYPAL_WEBHOOK_CONSUMER: Optional[str] = None  # defaults to the hostname
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,12 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from core.config.settings import settings
 from api.v1.routes import api_version_one
+from api.utils.password_hasher import password_hasher
+from api.db.redis import init_redis, close_redis
+from api.v1.services.token_revocation import revocation_cache
+from api.v1.services.user_cache import user_cache
+from api.v1.services.payment import close_http_client
+from api.v1.services.catalog_cache import catalog_cache
+from api.v1.services.progress_buffer import progress_buffer
+from api.v1.services.media_storage import media_storage
+from api.utils.media_files import MediaFiles
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_redis()
+    revocation_cache.start()
+    user_cache.start()
+    catalog_cache.start()
+    progress_buffer.start()
+    yield
+    await progress_buffer.stop()
+    await catalog_cache.stop()
+    await user_cache.stop()
+    await revocation_cache.stop()
+    await close_http_client()
+    await close_redis()
+    password_hasher.shutdown()
+    media_storage.shutdown()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -19,6 +47,7 @@ app.add_middleware(
 )
 
 app.include_router(api_version_one)
+app.mount(settings.MEDIA_URL, MediaFiles(directory=settings.MEDIA_ROOT), name="media")
 
 @app.get("/")
 def healthcheck():
@@ -0,0 +1,116 @@
+import os
+
+# Settings() reads these at import time; real values come from .env or the environment
+for name, value in {
+    "POSTGRES_SERVER": "127.0.0.1",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_DB": "konasal_test",
+    "SECRET_KEY": "test-secret-key",
+    "REDIS_HOST": "127.0.0.1",
+    "REDIS_PORT": "6379",
+    "REDIS_DB": "0",
+    "REDIS_URL": "redis://127.0.0.1:6379/0",
+    "CELERY_BROKER_URL": "redis://127.0.0.1:6379/1",
+    "CELERY_RESULT_BACKEND": "redis://127.0.0.1:6379/1",
+    "SENDGRID_API_KEY": "",
+    "PAYPAL_CLIENT_ID": "test-client",
+    "PAYPAL_CLIENT_SECRET": "test-secret",
+}.items():
+    os.environ.setdefault(name, value)
+
+import uuid
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+from api.db.session import async_session, engine
+from api.v1.models.course import Course
+from api.v1.models.user import User
+from api.v1.models.base_class import Base
+import api.v1.models  # noqa: F401  # registers every table on Base.metadata
+
+
+def _trigram_indexes():
+    return [
+        (table, index)
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+        if "gin_trgm_ops" in index.dialect_options["postgresql"]["ops"].values()
+    ]
+
+
+def _create_schema(sync_conn, trigram: bool):
+    Base.metadata.drop_all(sync_conn)
+    # Without pg_trgm (e.g. a Postgres built without contrib) leave out the
+    # trigram indexes, as the migration does; search falls back to ILIKE
+    skipped = [] if trigram else _trigram_indexes()
+    for table, index in skipped:
+        table.indexes.discard(index)
+    try:
+        Base.metadata.create_all(sync_conn)
+    finally:
+        for table, index in skipped:
+            table.indexes.add(index)
+
+
+@pytest.fixture
+async def db_engine():
+    """
+    The app's engine against an empty schema. Needs the Postgres described by
+    POSTGRES_*; tests using it are skipped when that database is unreachable.
+    """
+    try:
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            trigram = True
+        except DBAPIError:
+            trigram = False
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_schema, trigram)
+    except (OSError, ConnectionError) as e:
+        await engine.dispose()
+        pytest.skip(f"Postgres not available: {e}")
+    yield engine
+    # Pooled asyncpg connections belong to this test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+def statements(db_engine):
+    """SQL statements sent to the database while the test runs."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+async def user(db_engine):
+    async with async_session() as db:
+        user = User(
+            id=uuid.uuid4(),
+            first_name="Ada",
+            last_name="Lovelace",
+            email=f"{uuid.uuid4().hex}@example.com",
+            password_hash="not-a-real-hash",
+            is_verified=True,
+        )
+        db.add(user)
+        await db.commit()
+    return user
+
+
+@pytest.fixture
+async def course(db_engine):
+    async with async_session() as db:
+        course = Course(id=1, name="Data Analysis", category="Data", summary="Spreadsheets to SQL.", price=3500.0)
+        db.add(course)
+        await db.commit()
+    return course
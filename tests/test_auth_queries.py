@@ -0,0 +1,60 @@
+import httpx
+import pytest
+from sqlalchemy import update
+
+from api.db.session import async_session
+from api.v1.models.user import User
+from api.v1.services import auth as user_service
+from core.config.settings import settings
+from main import app
+
+PASSWORD = "Str0ng!pass"
+
+
+@pytest.fixture
+async def client(db_engine, monkeypatch):
+    # Keep signup on the database: no DNS, Redis or mail queue
+    monkeypatch.setattr(settings, "EMAIL_CHECK_MX", False)
+
+    async def store_verification_token(email, token):
+        pass
+
+    monkeypatch.setattr(user_service, "store_verification_token", store_verification_token)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def signup(client, email):
+    return await client.post("/api/v1/auth/signup", json={
+        "email": email,
+        "password": PASSWORD,
+        "password_verify": PASSWORD,
+        "first_name": "Ada",
+        "last_name": "Lovelace",
+    })
+
+
+async def test_signup_is_one_statement(client, statements):
+    response = await signup(client, "ada@example.com")
+    assert response.status_code == 200, response.text
+    assert len(statements) == 1, statements
+
+
+async def test_duplicate_signup_is_one_statement(client, statements):
+    await signup(client, "ada@example.com")
+    statements.clear()
+    response = await signup(client, "ada@example.com")
+    assert response.status_code == 400
+    assert len(statements) == 1, statements
+
+
+async def test_login_is_one_statement(client, statements):
+    await signup(client, "ada@example.com")
+    async with async_session() as db:
+        await db.execute(update(User).where(User.email == "ada@example.com").values(is_verified=True))
+        await db.commit()
+    statements.clear()
+
+    response = await client.post("/api/v1/auth/login", json={"email": "ada@example.com", "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    assert len(statements) == 1, statements
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from api.db.session import async_session
+from api.v1.models.course import Course
+from api.v1.services import catalog_cache as catalog_cache_module
+from api.v1.services.catalog_cache import CatalogCache
+from api.v1.services.course_service import CourseService
+
+
+async def test_build_failure_does_not_let_later_callers_build_in_parallel():
+    cache = CatalogCache(channel="test", maxsize=10, ttl=60)
+    builds = []
+    fail_first, finish_second = asyncio.Event(), asyncio.Event()
+
+    async def build():
+        builds.append(len(builds))
+        if len(builds) == 1:
+            await fail_first.wait()
+            raise ValueError("bad cursor")
+        await finish_second.wait()
+        return b"[]", None
+
+    first = asyncio.create_task(cache.get_or_build(("key",), build))
+    second = asyncio.create_task(cache.get_or_build(("key",), build))
+    await asyncio.sleep(0)
+    fail_first.set()
+    with pytest.raises(ValueError):
+        await first
+    await asyncio.sleep(0)
+    # Arrives while `second` is rebuilding; it must wait for that build
+    third = asyncio.create_task(cache.get_or_build(("key",), build))
+    await asyncio.sleep(0)
+    finish_second.set()
+
+    assert await second == await third
+    assert len(builds) == 2
+    assert cache._locks == {}
+
+
+@pytest.fixture
+def invalidations(monkeypatch):
+    calls = []
+
+    async def invalidate():
+        calls.append(True)
+
+    monkeypatch.setattr(catalog_cache_module.catalog_cache, "invalidate", invalidate)
+    return calls
+
+
+async def test_course_writes_invalidate_the_catalog(db_engine, invalidations):
+    async with async_session() as db:
+        await CourseService.create_course(
+            db, {"id": 7, "name": "Statistics", "category": "Data", "summary": "Means and medians.", "price": 10.0}
+        )
+        await CourseService.update_course(db, 7, {"price": 12.0})
+        await CourseService.seed_courses(db, [
+            {"id": 7, "name": "Statistics II", "category": "Data", "summary": "Regression.", "price": 15.0},
+            {"id": 8, "name": "Pottery", "category": "Craft", "summary": "Wheel throwing.", "price": 20.0},
+        ])
+        names = (await db.execute(select(Course.name).order_by(Course.id))).scalars().all()
+
+    assert names == ["Statistics II", "Pottery"]
+    assert len(invalidations) == 3
+
+
+async def test_updating_a_missing_course_is_a_404(db_engine, invalidations):
+    async with async_session() as db:
+        with pytest.raises(HTTPException) as error:
+            await CourseService.update_course(db, 404, {"price": 1.0})
+    assert error.value.status_code == 404
+    assert invalidations == []
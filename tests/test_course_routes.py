@@ -0,0 +1,53 @@
+import httpx
+import pytest
+
+from api.db.session import async_session
+from api.v1.models.course import Course
+from api.v1.services.catalog_cache import catalog_cache
+from core.config.settings import settings
+from main import app
+
+
+@pytest.fixture
+async def catalog(db_engine):
+    catalog_cache.clear()
+    async with async_session() as db:
+        db.add_all([
+            Course(id=course_id, name=f"Course {course_id}", category="Data", summary="Summary.", price=10.0)
+            for course_id in range(1, 76)
+        ])
+        await db.commit()
+    yield
+    catalog_cache.clear()
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_bulk_lookup_returns_every_requested_course(client, catalog):
+    ids = ",".join(str(course_id) for course_id in range(1, 61))
+    response = await client.get("/api/v1/courses/", params={"ids": ids, "fields": "name"})
+
+    assert response.status_code == 200
+    assert [course["id"] for course in response.json()] == list(range(1, 61))
+    assert "X-Next-Cursor" not in response.headers
+
+
+async def test_bulk_lookup_rejects_limit(client, catalog):
+    response = await client.get("/api/v1/courses/", params={"ids": "1,2", "limit": 1})
+    assert response.status_code == 400
+
+
+async def test_listing_pages_by_the_default_limit(client, catalog):
+    response = await client.get("/api/v1/courses/", params={"fields": "name"})
+
+    assert len(response.json()) == settings.COURSE_PAGE_SIZE_DEFAULT
+    assert response.headers["X-Next-Cursor"]
+
+
+def test_listing_documents_the_course_schema():
+    schema = app.openapi()["paths"]["/api/v1/courses/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["items"]["$ref"].endswith("/Course")
@@ -0,0 +1,72 @@
+import pytest
+
+from api.db.session import async_session
+from api.v1.models.course import Course
+from api.v1.services import course_search
+from api.v1.services.course_search import search_in_memory
+from api.v1.services.course_service import CourseService
+
+COURSES = [
+    Course(id=1, name="Data Analysis", category="Data", summary="Spreadsheets to SQL.", price=3500.0),
+    Course(id=2, name="Python Basics", category="Programming", summary="Clean data with pandas.", price=2000.0),
+    Course(id=3, name="Machine Learning", category="Data", summary="Models from scratch.", price=5000.0),
+    Course(id=4, name="Bread Baking", category="Cooking", summary="Sourdough at home.", price=900.0),
+]
+
+
+def copies():
+    return [
+        Course(id=c.id, name=c.name, category=c.category, summary=c.summary, price=c.price)
+        for c in COURSES
+    ]
+
+
+@pytest.fixture
+async def courses(db_engine, monkeypatch):
+    monkeypatch.setattr(course_search, "_trigram_available", None)
+    async with async_session() as db:
+        db.add_all(copies())
+        await db.commit()
+
+
+async def search_ids(search: str, **kwargs):
+    async with async_session() as db:
+        rows, _ = await CourseService.get_courses_page(db, search=search, fields=["id"], **kwargs)
+    return [row["id"] for row in rows]
+
+
+def test_in_memory_index_ranks_name_matches_first():
+    assert [course.id for course in search_in_memory(copies(), "data")] == [1, 2]
+
+
+def test_in_memory_index_matches_word_prefixes():
+    assert [course.id for course in search_in_memory(copies(), "mach")] == [3]
+    assert search_in_memory(copies(), "") == []
+
+
+async def test_search_ranks_name_matches_above_summary_matches(courses):
+    assert await search_ids("data") == [1, 2]
+
+
+async def test_search_pages_by_offset(courses):
+    async with async_session() as db:
+        first, cursor = await CourseService.get_courses_page(db, search="data", limit=1, fields=["id"])
+        second, last = await CourseService.get_courses_page(db, search="data", limit=1, cursor=cursor, fields=["id"])
+    assert ([row["id"] for row in first], [row["id"] for row in second], last) == ([1], [2], None)
+
+
+async def test_search_without_pg_trgm_matches_name_substrings(courses, monkeypatch):
+    monkeypatch.setattr(course_search, "_trigram_available", False)
+
+    # Not a whole word, so only the ILIKE fallback on the name finds it
+    assert await search_ids("nalys") == [1]
+    assert await search_ids("learning") == [3]
+    assert await search_ids("100%") == []
+
+
+async def test_search_with_pg_trgm_tolerates_typos(courses):
+    async with async_session() as db:
+        if not await course_search.trigram_available(db):
+            pytest.skip("pg_trgm is not installed")
+
+    assert await search_ids("Machine Lerning") == [3]
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.db.session import InstrumentedPool
+from core.config.settings import settings
+
+
+@pytest.fixture
+async def small_engine(db_engine):
+    engine = create_async_engine(
+        settings.SQLALCHEMY_DATABASE_URI, poolclass=InstrumentedPool, pool_size=1, max_overflow=0, pool_timeout=0.2
+    )
+    yield engine
+    await engine.dispose()
+
+
+async def test_opening_a_connection_is_not_counted_as_waiting(small_engine):
+    async with small_engine.connect():
+        pass
+
+    pool = small_engine.sync_engine.pool
+    assert (pool.checkout_count, pool.checkout_timeouts) == (1, 0)
+    assert pool.total_wait_seconds == 0.0
+
+
+async def test_wait_for_a_free_connection_is_timed(small_engine):
+    pool = small_engine.sync_engine.pool
+    held = await small_engine.connect()
+
+    async def checkout():
+        async with small_engine.connect():
+            pass
+
+    waiter = asyncio.create_task(checkout())
+    await asyncio.sleep(0.1)
+    await held.close()
+    await waiter
+
+    assert pool.checkout_count == 2
+    assert 0.1 <= pool.max_wait_seconds < 0.2
+    assert pool.total_wait_seconds == pool.max_wait_seconds
+
+
+async def test_timed_out_checkouts_are_counted_separately(small_engine):
+    pool = small_engine.sync_engine.pool
+    async with small_engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            await small_engine.connect()
+
+    assert (pool.checkout_count, pool.checkout_timeouts) == (1, 1)
+    assert pool.total_wait_seconds == 0.0
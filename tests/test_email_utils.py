@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import dns.exception
+import dns.resolver
+import pytest
+
+from api.utils.email_utils import MXCache
+
+
+class StubResolver:
+    """Answers from a {(domain, rdtype): ttl or exception class} table."""
+
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    async def resolve(self, domain, rdtype):
+        self.calls.append((domain, rdtype))
+        result = self.records.get((domain, rdtype), dns.resolver.NoAnswer)
+        if isinstance(result, type) and issubclass(result, Exception):
+            raise result()
+        return SimpleNamespace(rrset=SimpleNamespace(ttl=result))
+
+
+async def test_mx_record_is_reachable_and_cached():
+    resolver = StubResolver({("gmail.com", "MX"): 3600})
+    cache = MXCache(resolver)
+    assert await cache.has_mx("Gmail.com.")
+    assert await cache.has_mx("gmail.com")
+    assert resolver.calls == [("gmail.com", "MX")]
+
+
+@pytest.mark.parametrize("error", [dns.exception.Timeout, dns.resolver.NoNameservers])
+async def test_transient_dns_failure_fails_open_without_caching(error):
+    resolver = StubResolver({("gmail.com", "MX"): error})
+    cache = MXCache(resolver)
+    assert await cache.has_mx("gmail.com")
+    assert await cache.has_mx("gmail.com")
+    assert len(resolver.calls) == 2
+
+
+async def test_nxdomain_is_unreachable_and_cached():
+    resolver = StubResolver({("nope.invalid", "MX"): dns.resolver.NXDOMAIN})
+    cache = MXCache(resolver)
+    assert not await cache.has_mx("nope.invalid")
+    assert not await cache.has_mx("nope.invalid")
+    assert len(resolver.calls) == 1
+
+
+async def test_implicit_mx_falls_back_to_address_records():
+    resolver = StubResolver({("a-only.example", "A"): 300, ("v6-only.example", "AAAA"): 300})
+    cache = MXCache(resolver)
+    assert await cache.has_mx("a-only.example")
+    assert await cache.has_mx("v6-only.example")
+    assert not await cache.has_mx("nothing.example")
+    assert resolver.calls[-3:] == [
+        ("nothing.example", "MX"), ("nothing.example", "A"), ("nothing.example", "AAAA"),
+    ]
@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from api.db.session import async_session
+from api.v1.models.enrollment import Enrollment
+from api.v1.routes import course as course_routes
+from api.v1.services.auth import get_current_user
+from api.v1.services.course_service import CourseService
+from main import app
+
+CONCURRENT_REQUESTS = 20
+
+
+async def test_concurrent_enrollments_insert_exactly_once(user, course):
+    async def enroll():
+        async with async_session() as db:
+            return await CourseService.enroll_user(db, user.id, course.id)
+
+    results = await asyncio.gather(*(enroll() for _ in range(CONCURRENT_REQUESTS)))
+
+    assert sum(created for _, created in results) == 1
+    assert {name for name, _ in results} == {course.name}
+    async with async_session() as db:
+        count = await db.scalar(select(func.count()).select_from(Enrollment).where(Enrollment.user_id == user.id))
+    assert count == 1
+
+
+@pytest.fixture
+async def client(user, monkeypatch):
+    # Idempotency records normally live in Redis
+    stored = {}
+
+    async def get_stored_response(scope, key):
+        return stored.get((scope, key))
+
+    async def store_response(scope, key, response):
+        stored.setdefault((scope, key), response)
+
+    monkeypatch.setattr(course_routes, "get_stored_response", get_stored_response)
+    monkeypatch.setattr(course_routes, "store_response", store_response)
+    app.dependency_overrides[get_current_user] = lambda: user
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+async def test_idempotency_key_replays_instead_of_conflicting(client, course):
+    url = f"/api/v1/courses/enroll/{course.id}"
+    first = await client.post(url, headers={"Idempotency-Key": "checkout-1"})
+    replay = await client.post(url, headers={"Idempotency-Key": "checkout-1"})
+    without_key = await client.post(url)
+
+    assert first.status_code == replay.status_code == 200
+    assert replay.json() == first.json()
+    assert without_key.status_code == 400
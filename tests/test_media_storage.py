@@ -0,0 +1,46 @@
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+
+from api.v1.services.media_storage import MediaStorage
+
+
+def png_upload() -> UploadFile:
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 200), "teal").save(buffer, "PNG")
+    buffer.seek(0)
+    return UploadFile(file=buffer, filename="avatar.png")
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = MediaStorage(root=str(tmp_path / "uploads"), thumbnail_workers=1)
+    yield storage
+    storage.shutdown()
+
+
+def test_staging_dir_is_outside_the_served_root(storage, tmp_path):
+    assert storage.staging_dir == str(tmp_path / ".uploads-staging")
+    assert not os.path.abspath(storage.staging_dir).startswith(os.path.abspath(storage.root) + os.sep)
+
+
+async def test_upload_is_staged_outside_the_root_then_promoted(storage):
+    relative_path, thumbnails = await storage.save_image(png_upload(), "profile_pictures", max_bytes=1024 * 1024)
+
+    assert os.path.isfile(os.path.join(storage.root, relative_path))
+    assert sorted(thumbnails) == [128, 256]
+    assert os.listdir(storage.root) == ["profile_pictures"]
+    assert os.listdir(storage.staging_dir) == []
+
+
+async def test_rejected_upload_leaves_nothing_behind(storage):
+    upload = UploadFile(file=io.BytesIO(b"not an image"), filename="notes.txt")
+    with pytest.raises(HTTPException) as error:
+        await storage.save_image(upload, "profile_pictures", max_bytes=1024)
+
+    assert error.value.status_code == 415
+    assert os.listdir(storage.staging_dir) == []
+    assert not os.path.exists(storage.root)
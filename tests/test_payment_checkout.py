@@ -0,0 +1,147 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from api.db.session import async_session, get_pool_stats
+from api.v1.models.payment import Payment
+from api.v1.services import payment as payment_module
+from api.v1.services.auth import get_current_user
+from api.v1.services.checkout import capture_request_id
+from api.v1.services.paypal_resilience import CircuitBreaker
+from core.config.settings import settings
+from main import app
+
+
+class SlowPayPal:
+    """
+    MockTransport handler for the order endpoints. Each order call waits on
+    `release` (if set), so a test can look at the database mid-call, and
+    answers from `responses` when any are queued.
+    """
+
+    def __init__(self):
+        self.entered = asyncio.Event()
+        self.release = None
+        self.responses = []
+        self.order_requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/v1/oauth2/token":
+            return httpx.Response(200, json={"access_token": "token", "expires_in": 32400})
+        self.order_requests.append(request)
+        self.entered.set()
+        if self.release is not None:
+            await self.release.wait()
+        if self.responses:
+            return self.responses.pop(0)
+        if request.url.path == "/v2/checkout/orders":
+            return httpx.Response(201, json={
+                "id": "ORDER-1",
+                "status": "CREATED",
+                "links": [{"rel": "approve", "href": "https://paypal.test/checkoutnow?token=ORDER-1"}],
+            })
+        return httpx.Response(201, json={
+            "id": "ORDER-1",
+            "status": "COMPLETED",
+            "purchase_units": [{"payments": {"captures": [{"id": "CAPTURE-1", "status": "COMPLETED"}]}}],
+        })
+
+
+@pytest.fixture
+async def paypal(user, monkeypatch):
+    paypal = SlowPayPal()
+    monkeypatch.setattr(payment_module, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(paypal)))
+    monkeypatch.setattr(payment_module, "paypal_breaker", CircuitBreaker(100, 60, 1))
+    monkeypatch.setattr(settings, "PAYPAL_MAX_RETRIES", 0)
+    payment_module.paypal_service.invalidate_access_token()
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield paypal
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+async def client(paypal):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def payment(user, course):
+    async with async_session() as db:
+        payment = Payment(
+            id=uuid.uuid4(), user_id=user.id, course_id=course.id, amount=3500.0,
+            paypal_order_id="ORDER-1", status="approved",
+        )
+        db.add(payment)
+        await db.commit()
+    return payment
+
+
+async def payment_status(payment_id) -> str:
+    async with async_session() as db:
+        return await db.scalar(select(Payment.status).where(Payment.id == payment_id))
+
+
+async def hold_paypal_and_check_pool(paypal, request):
+    paypal.release = asyncio.Event()
+    task = asyncio.create_task(request)
+    await asyncio.wait_for(paypal.entered.wait(), timeout=5)
+    checked_out = get_pool_stats()["checked_out"]
+    paypal.release.set()
+    return checked_out, await task
+
+
+async def test_create_order_holds_no_connection_during_paypal_call(client, paypal, course):
+    checked_out, response = await hold_paypal_and_check_pool(
+        paypal, client.post("/api/v1/payments/create-order", json={"course_id": course.id, "amount": 3500.0})
+    )
+
+    assert checked_out == 0
+    assert response.status_code == 200, response.text
+    async with async_session() as db:
+        payment = (await db.execute(select(Payment))).scalar_one()
+    assert (payment.paypal_order_id, payment.status) == ("ORDER-1", "pending")
+    assert paypal.order_requests[0].headers["PayPal-Request-Id"] == str(payment.id)
+
+
+async def test_capture_holds_no_connection_during_paypal_call(client, paypal, payment):
+    checked_out, response = await hold_paypal_and_check_pool(paypal, client.post("/api/v1/payments/capture/ORDER-1"))
+
+    assert checked_out == 0
+    assert response.status_code == 200, response.text
+    assert await payment_status(payment.id) == "completed"
+
+
+async def test_unknown_capture_outcome_stays_capturing_and_retry_reuses_request_id(client, paypal, payment):
+    paypal.responses.append(httpx.Response(503))
+    first = await client.post("/api/v1/payments/capture/ORDER-1")
+    assert first.status_code == 503
+    assert await payment_status(payment.id) == "capturing"
+
+    retry = await client.post("/api/v1/payments/capture/ORDER-1")
+    assert retry.status_code == 200, retry.text
+    assert await payment_status(payment.id) == "completed"
+    assert [r.headers["PayPal-Request-Id"] for r in paypal.order_requests] == [capture_request_id(payment.id)] * 2
+
+
+async def test_refused_capture_restores_the_payment(client, paypal, payment):
+    paypal.responses.append(httpx.Response(422, json={
+        "name": "UNPROCESSABLE_ENTITY", "details": [{"issue": "ORDER_NOT_APPROVED"}],
+    }))
+    response = await client.post("/api/v1/payments/capture/ORDER-1")
+
+    assert response.status_code == 400
+    assert await payment_status(payment.id) == "approved"
+
+
+async def test_already_captured_order_is_settled_from_paypal(client, paypal, payment):
+    paypal.responses.append(httpx.Response(422, json={
+        "name": "UNPROCESSABLE_ENTITY", "details": [{"issue": "ORDER_ALREADY_CAPTURED"}],
+    }))
+    response = await client.post("/api/v1/payments/capture/ORDER-1")
+
+    assert response.status_code == 200, response.text
+    assert await payment_status(payment.id) == "completed"
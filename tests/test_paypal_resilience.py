@@ -0,0 +1,133 @@
+import time
+
+import httpx
+import pytest
+
+from api.v1.services import payment as payment_module
+from api.v1.services.payment import PayPalService
+from api.v1.services.paypal_resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, PayPalUnavailableError,
+)
+from core.config.settings import settings
+
+
+def test_breaker_opens_fails_fast_and_recovers_through_one_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05, half_open_max_calls=1)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(PayPalUnavailableError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()  # the probe
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(PayPalUnavailableError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.stats()["transitions"] == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+    assert breaker.stats()["rejected"] == 2
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0, half_open_max_calls=1)
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+class FakePayPal:
+    """MockTransport handler answering order calls from a scripted list."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.order_requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/v1/oauth2/token":
+            return httpx.Response(200, json={"access_token": "token", "expires_in": 32400})
+        self.order_requests.append(request)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60, half_open_max_calls=1)
+    monkeypatch.setattr(payment_module, "paypal_breaker", breaker)
+    monkeypatch.setattr(settings, "PAYPAL_RETRY_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(settings, "PAYPAL_MAX_RETRIES", 2)
+    return breaker
+
+
+def use_paypal(monkeypatch, handler):
+    monkeypatch.setattr(payment_module, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return PayPalService()
+
+
+async def test_create_order_retries_with_the_same_request_id(monkeypatch, breaker):
+    paypal = FakePayPal(
+        httpx.Response(503),
+        httpx.ConnectTimeout("slow"),
+        httpx.Response(201, json={"id": "ORDER-1", "status": "CREATED", "links": []}),
+    )
+    order = await use_paypal(monkeypatch, paypal).create_order(amount=10.0, request_id="payment-1")
+
+    assert order["id"] == "ORDER-1"
+    assert [r.headers["PayPal-Request-Id"] for r in paypal.order_requests] == ["payment-1"] * 3
+    assert breaker.state == CLOSED
+
+
+async def test_post_without_request_id_is_not_retried(monkeypatch, breaker):
+    paypal = FakePayPal(httpx.Response(503))
+    service = use_paypal(monkeypatch, paypal)
+    with pytest.raises(PayPalUnavailableError):
+        await service._request("create_order", "POST", "/v2/checkout/orders", json={})
+    assert len(paypal.order_requests) == 1
+
+
+async def test_client_errors_are_not_retried(monkeypatch, breaker):
+    paypal = FakePayPal(httpx.Response(422, json={"name": "UNPROCESSABLE_ENTITY"}))
+    with pytest.raises(Exception, match="422"):
+        await use_paypal(monkeypatch, paypal).capture_order("ORDER-1")
+    assert len(paypal.order_requests) == 1
+    assert breaker.state == CLOSED
+
+
+async def test_open_circuit_fails_fast_without_calling_paypal(monkeypatch, breaker):
+    paypal = FakePayPal(*[httpx.Response(503)] * 3)
+    service = use_paypal(monkeypatch, paypal)
+    with pytest.raises(PayPalUnavailableError):
+        await service.get_order("ORDER-1")
+    assert breaker.state == OPEN
+
+    with pytest.raises(PayPalUnavailableError, match="open"):
+        await service.get_order("ORDER-1")
+    assert len(paypal.order_requests) == 3
+
+
+async def test_half_open_probe_can_refresh_a_revoked_token(monkeypatch, breaker):
+    paypal = FakePayPal(
+        httpx.Response(401, json={"error": "invalid_token"}),
+        httpx.Response(200, json={"id": "ORDER-1", "status": "APPROVED"}),
+    )
+    service = use_paypal(monkeypatch, paypal)
+    service.access_token, service.token_expires_at = "revoked", time.monotonic() + 3600
+    breaker.reset_seconds = 0.0
+    breaker.before_call()
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == OPEN
+
+    order = await service.get_order("ORDER-1")
+
+    assert order["status"] == "APPROVED"
+    assert [r.headers["Authorization"] for r in paypal.order_requests] == ["Bearer revoked", "Bearer token"]
+    assert breaker.state == CLOSED
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from api.v1.services import payment as payment_module
+from api.v1.services.paypal_webhooks import WebhookVerificationError, WebhookVerifier
+from benchmarks.fake_paypal import CERT_NAME, capture_completed_event, sign_webhook, signing_cert_pem
+
+WEBHOOK_ID = "WH-TEST"
+CERT_URL = f"https://api-m.sandbox.paypal.com/v1/notifications/certs/{CERT_NAME}"
+
+
+@pytest.fixture
+def cert_requests(monkeypatch):
+    """Serve the fake PayPal's signing cert through the shared HTTP client."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        return httpx.Response(200, content=signing_cert_pem)
+
+    monkeypatch.setattr(payment_module, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return requests
+
+
+@pytest.fixture
+def verifier():
+    return WebhookVerifier(WEBHOOK_ID, ["https://api-m.sandbox.paypal.com/"], cert_ttl=3600, tolerance=300)
+
+
+def lowercase(headers):
+    # Starlette hands the route lower-cased header names
+    return {name.lower(): value for name, value in headers.items()}
+
+
+async def test_valid_signature_verifies_and_caches_the_cert(verifier, cert_requests):
+    for _ in range(3):
+        headers, body = sign_webhook(capture_completed_event("ORDER-1"), WEBHOOK_ID, CERT_URL)
+        await verifier.verify(lowercase(headers), body)
+    assert cert_requests == [CERT_URL]
+
+
+async def test_tampered_body_is_rejected(verifier, cert_requests):
+    headers, body = sign_webhook(capture_completed_event("ORDER-1"), WEBHOOK_ID, CERT_URL)
+    with pytest.raises(WebhookVerificationError):
+        await verifier.verify(lowercase(headers), body.replace(b"ORDER-1", b"ORDER-2"))
+
+
+async def test_other_webhook_id_is_rejected(verifier, cert_requests):
+    headers, body = sign_webhook(capture_completed_event("ORDER-1"), "WH-SOMEONE-ELSE", CERT_URL)
+    with pytest.raises(WebhookVerificationError):
+        await verifier.verify(lowercase(headers), body)
+
+
+async def test_untrusted_cert_url_is_never_fetched(verifier, cert_requests):
+    headers, body = sign_webhook(capture_completed_event("ORDER-1"), WEBHOOK_ID, "https://evil.example/cert.pem")
+    with pytest.raises(WebhookVerificationError, match="Untrusted"):
+        await verifier.verify(lowercase(headers), body)
+    assert cert_requests == []
+
+
+async def test_stale_transmission_is_rejected(verifier, cert_requests):
+    headers, body = sign_webhook(capture_completed_event("ORDER-1"), WEBHOOK_ID, CERT_URL)
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    headers["PAYPAL-TRANSMISSION-TIME"] = stale.strftime("%Y-%m-%dT%H:%M:%SZ")
+    with pytest.raises(WebhookVerificationError, match="tolerance"):
+        await verifier.verify(lowercase(headers), body)
+
+
+def test_capture_event_maps_to_its_order():
+    from api.workers.paypal_webhook_worker import parse_event
+
+    event = capture_completed_event("ORDER-1")
+    assert parse_event(event) == ("ORDER-1", "completed", event["resource"]["id"])
+    assert parse_event({"event_type": "BILLING.PLAN.CREATED", "resource": {}}) is None
@@ -0,0 +1,81 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from api.db.redis import COMPARE_AND_DELETE
+from api.db.session import async_session
+from api.v1.models.enrollment import Enrollment
+from api.v1.services import progress_buffer as progress_buffer_module
+from api.v1.services.progress_buffer import ProgressBuffer
+
+
+class ScriptedRedis:
+    """The few Redis calls ProgressBuffer makes, with its Lua scripts run in Python."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    async def eval(self, script, numkeys, *args):
+        keys, argv = args[:numkeys], args[numkeys:]
+        if script == progress_buffer_module._SET_MAX:
+            hash_ = self.data.setdefault(keys[0], {})
+            if argv[0] not in hash_ or float(argv[1]) > float(hash_[argv[0]]):
+                hash_[argv[0]] = str(argv[1])
+            return 1
+        if script == progress_buffer_module._CLAIM_BATCH:
+            if keys[1] in self.data:
+                return 1
+            if keys[0] in self.data:
+                self.data[keys[1]] = self.data.pop(keys[0])
+                return 1
+            return 0
+        if script == COMPARE_AND_DELETE:
+            if self.data.get(keys[0]) == argv[0]:
+                return await self.delete(keys[0])
+            return 0
+        raise AssertionError(f"unexpected script {script!r}")
+
+
+@pytest.fixture
+async def enrollment(user, course):
+    async with async_session() as db:
+        enrollment = Enrollment(id=uuid.uuid4(), user_id=user.id, course_id=course.id, progress=0.0)
+        db.add(enrollment)
+        await db.commit()
+    return enrollment
+
+
+async def stored_progress(enrollment) -> float:
+    async with async_session() as db:
+        return await db.scalar(select(Enrollment.progress).where(Enrollment.id == enrollment.id))
+
+
+async def test_later_lower_report_does_not_lower_flushed_progress(enrollment, monkeypatch):
+    monkeypatch.setattr(progress_buffer_module, "get_redis", lambda redis=ScriptedRedis(): redis)
+    buffer = ProgressBuffer(interval=1.0, batch_size=100)
+
+    await buffer.record(enrollment.user_id, enrollment.course_id, 60.0)
+    await buffer.record(enrollment.user_id, enrollment.course_id, 40.0)
+    assert await buffer.flush() == 1
+    assert await stored_progress(enrollment) == 60.0
+
+    await buffer.record(enrollment.user_id, enrollment.course_id, 30.0)
+    assert await buffer.flush() == 1
+    assert await stored_progress(enrollment) == 60.0
+
+    await buffer.record(enrollment.user_id, enrollment.course_id, 80.0)
+    assert await buffer.flush() == 1
+    assert await stored_progress(enrollment) == 80.0
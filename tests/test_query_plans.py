@@ -0,0 +1,68 @@
+"""
+The hot enrollment/payment/course queries must be able to use their indexes.
+
+Plans are taken with sequential scans disabled, so the empty test tables
+don't mask a missing index.
+"""
+import json
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+SAMPLE_USER = str(uuid.uuid4())
+
+# (SQL, params, index the plan must use)
+HOT_QUERIES = {
+    "enrollment by user and course": (
+        "SELECT id FROM enrollments WHERE user_id = :user_id AND course_id = :course_id",
+        {"user_id": SAMPLE_USER, "course_id": 1},
+        "uq_enrollments_user_course",
+    ),
+    "enrollments for a user (dashboard)": (
+        "SELECT c.id, e.progress FROM courses c JOIN enrollments e ON e.course_id = c.id WHERE e.user_id = :user_id",
+        {"user_id": SAMPLE_USER},
+        "uq_enrollments_user_course",
+    ),
+    "enrollments for a course": (
+        "SELECT user_id FROM enrollments WHERE course_id = :course_id",
+        {"course_id": 1},
+        "ix_enrollments_course_id",
+    ),
+    "payments by user and status": (
+        "SELECT id FROM payments WHERE user_id = :user_id AND status = :status",
+        {"user_id": SAMPLE_USER, "status": "pending"},
+        "ix_payments_user_id_status",
+    ),
+    "payment by PayPal order id": (
+        "SELECT id FROM payments WHERE paypal_order_id = :order_id",
+        {"order_id": "ORDER-1"},
+        "payments_paypal_order_id_key",
+    ),
+    "course full-text search": (
+        "SELECT id FROM courses WHERE search_vector @@ websearch_to_tsquery('english', :search)",
+        {"search": "machine learning"},
+        "ix_courses_search_vector",
+    ),
+}
+
+
+def plan_indexes(node: dict) -> set:
+    indexes = set()
+    if "Index Name" in node:
+        indexes.add(node["Index Name"])
+    for child in node.get("Plans", []):
+        indexes |= plan_indexes(child)
+    return indexes
+
+
+@pytest.mark.parametrize("query", HOT_QUERIES)
+async def test_hot_query_uses_its_index(db_engine, query):
+    sql, params, expected = HOT_QUERIES[query]
+    async with db_engine.connect() as conn:
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params)).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    assert expected in plan_indexes(plan[0]["Plan"])
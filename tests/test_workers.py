@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from redis.exceptions import RedisError
+
+from api.db.redis import close_redis
+from api.workers import email_worker as email_worker_module
+from api.workers.email_worker import EmailWorker
+from api.workers.paypal_webhook_worker import PayPalWebhookWorker
+from core.config.settings import settings
+
+
+class StubRedisServer:
+    """
+    Just enough of a RESP2 server: `replies` maps a command name to
+    (seconds to wait, raw reply), so a blocking read can be held open
+    past the shared pool's socket timeout.
+    """
+
+    def __init__(self):
+        self.replies = {"PING": (0, b"+PONG\r\n")}
+        self.commands = []
+        self.server = None
+
+    async def _read_command(self, reader):
+        header = await reader.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2].decode())
+        return args
+
+    async def _serve(self, reader, writer):
+        try:
+            while (args := await self._read_command(reader)) is not None:
+                name = args[0].upper()
+                self.commands.append(name)
+                delay, reply = self.replies.get(name, (0, b"+OK\r\n"))
+                await asyncio.sleep(delay)
+                writer.write(reply)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+
+
+@pytest.fixture
+async def redis_server(monkeypatch):
+    server = StubRedisServer()
+    monkeypatch.setattr(settings, "REDIS_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "REDIS_PORT", await server.start())
+    monkeypatch.setattr(settings, "REDIS_SOCKET_TIMEOUT", 0.2)
+    await close_redis()
+    yield server
+    await close_redis()
+    await server.stop()
+
+
+async def test_email_worker_idle_poll_outlasts_socket_timeout(redis_server, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_WORKER_POLL_SECONDS", 0.4)
+    redis_server.replies["BLMOVE"] = (0.4, b"$-1\r\n")
+
+    assert await EmailWorker("test").claim_batch() == []
+
+
+async def test_webhook_worker_idle_poll_outlasts_socket_timeout(redis_server, monkeypatch):
+    monkeypatch.setattr(settings, "PAYPAL_WEBHOOK_BLOCK_SECONDS", 0.4)
+    redis_server.replies["XAUTOCLAIM"] = (0, b"*3\r\n$3\r\n0-0\r\n*0\r\n*0\r\n")
+    redis_server.replies["XREADGROUP"] = (0.4, b"*-1\r\n")
+
+    assert await PayPalWebhookWorker("test").claim_batch() == []
+
+
+async def test_email_worker_survives_redis_errors(redis_server, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_WORKER_POLL_SECONDS", 0.01)
+    redis_server.replies["LMOVE"] = (0, b"$-1\r\n")
+    redis_server.replies["ZRANGEBYSCORE"] = (0, b"*0\r\n")
+    worker = EmailWorker("test")
+    outcomes = [RedisError("Timeout reading from socket"), asyncio.CancelledError()]
+
+    async def claim_batch():
+        raise outcomes.pop(0)
+
+    monkeypatch.setattr(worker, "claim_batch", claim_batch)
+    monkeypatch.setattr(email_worker_module.email_templates, "load", lambda: None)
+    with pytest.raises(asyncio.CancelledError):
+        await worker.run()
+
+    assert outcomes == []
+    # Claimed jobs are requeued again after the error
+    assert redis_server.commands.count("LMOVE") == 2
+
+
+async def test_webhook_worker_survives_redis_errors(redis_server, monkeypatch):
+    monkeypatch.setattr(settings, "PAYPAL_WEBHOOK_BLOCK_SECONDS", 0.01)
+    redis_server.replies["XREADGROUP"] = (0, b"*-1\r\n")
+    worker = PayPalWebhookWorker("test")
+    outcomes = [RedisError("Timeout reading from socket"), asyncio.CancelledError()]
+
+    async def claim_batch():
+        raise outcomes.pop(0)
+
+    monkeypatch.setattr(worker, "claim_batch", claim_batch)
+    with pytest.raises(asyncio.CancelledError):
+        await worker.run()
+
+    assert outcomes == []
+    # Pending entries are read back again after the error
+    assert redis_server.commands.count("XREADGROUP") == 2